@@ -0,0 +1,421 @@
+import time
+import numpy as np
+from camera_handler import CameraHandler
+from hand_detector import HandDetector
+from finger_counter import FingerCounter
+from gesture_recognizer import GestureRecognizer
+from hand_tracker import HandTracker, analyze_hands
+from media_writer import MediaWriter
+from metrics import metrics, FRAME_LATENCY, DETECTOR_DUTY
+from motion_gestures import MotionGestureRecognizer
+from pipeline import FramePipeline
+from presence_gate import PresenceGate
+from profiler import profiler
+from startup import lazy_import, startup
+from recording import SessionRecorder
+from scheduler import QualityScheduler
+from overlay import Overlay
+from utils import draw_landmark_array, get_fps_color
+from config import *
+
+cv2 = lazy_import("cv2")
+
+class HandGestureApp:
+    def __init__(self, startup_report=STARTUP_REPORT):
+        self.camera = CameraHandler()
+        self.detector = HandDetector()
+        self.finger_counter = FingerCounter()
+        self.gesture_recognizer = GestureRecognizer()
+        self.hand_tracker = HandTracker()
+        self.motion_recognizer = MotionGestureRecognizer() if MOTION_GESTURES else None
+        self.motion_labels = {}  # track id -> (motion gesture, time shown)
+        self.overlay = Overlay()
+        self.recorder = None
+        self.media_writer = MediaWriter()
+        self.last_stable = {}  # track id -> stable gesture, for clip triggers
+        self.scheduler = QualityScheduler() if ADAPTIVE_QUALITY else None
+        self.gate = PresenceGate() if PRESENCE_GATE else None
+        self.show_profile = PROFILE_OVERLAY
+        profiler.enabled = profiler.enabled or self.show_profile
+        self.startup_report = startup_report
+        self.first_frame_shown = False
+        
+    def run(self):
+        """Main application loop"""
+        print("Starting Hand Gesture Recognition App...")
+        print("Press 'q' to quit")
+        print("Press 's' to save screenshot")
+        print("Press 'p' to toggle latency breakdown")
+        
+        try:
+            if METRICS_PORT:
+                metrics.serve()
+            
+            # Build the detection model while the camera opens (worker processes build their own)
+            if DETECTOR_WARMUP and PIPELINE_MODE != "multiprocess":
+                self.detector.warm_up()
+            
+            # Initialize camera
+            self.camera.initialize()
+            startup.mark("camera")
+            
+            if PIPELINE_MODE == "pipelined":
+                self.run_pipelined()
+            elif PIPELINE_MODE == "multiprocess":
+                self.run_multiprocess()
+            else:
+                self.run_serial()
+                    
+        except Exception as e:
+            print(f"Error: {e}")
+            
+        finally:
+            # Cleanup
+            if profiler.enabled and profiler.dump_file:
+                print(f"Profile saved: {profiler.dump()}")
+            if METRICS_FILE:
+                metrics.dump()
+            if self.gate is not None:
+                print(f"Detector duty cycle: {self.gate.duty_cycle * 100:.1f}% "
+                      f"({self.gate.detections} of {self.gate.frames} frames)")
+            self.media_writer.close()
+            if self.media_writer.dropped:
+                print(f"Media writer dropped {self.media_writer.dropped} writes")
+            if self.recorder is not None:
+                self.recorder.close()
+                print(f"Recorded {self.recorder.frames_written} frames: {self.recorder.path}")
+            self.camera.release()
+            cv2.destroyAllWindows()
+    
+    def run_serial(self):
+        """Capture, detect and render one frame at a time"""
+        while True:
+            with profiler.span("frame"):
+                # Get frame from camera (a ring buffer we own until released)
+                frame = self.camera.get_frame_buffer()
+                if frame is None:
+                    print("Failed to get frame")
+                    break
+                
+                try:
+                    hands, landmarks = self.process_frame(frame)
+                    self.draw_frame(frame, hands, landmarks)
+                    self.record_media(frame, hands)
+                    
+                    if not self.show_frame(frame):
+                        break
+                finally:
+                    self.camera.release_frame(frame)
+            profiler.maybe_dump()
+            metrics.maybe_dump()
+    
+    def run_pipelined(self):
+        """Run capture and detection on worker threads and render on this thread"""
+        pipeline = FramePipeline(self.camera.get_frame_buffer, self.process_frame,
+                                 release_fn=self.camera.release_frame).start()
+        try:
+            while True:
+                item = pipeline.get_result()
+                if item is None:
+                    print("Failed to get frame")
+                    break
+                
+                frame, (hands, landmarks) = item
+                try:
+                    self.draw_frame(frame, hands, landmarks)
+                    self.record_media(frame, hands)
+                    
+                    if not self.show_frame(frame):
+                        break
+                finally:
+                    self.camera.release_frame(frame)
+                profiler.maybe_dump()
+                metrics.maybe_dump()
+        finally:
+            pipeline.stop()
+            if pipeline.dropped_frames or pipeline.dropped_results:
+                print(f"Pipeline dropped {pipeline.dropped_frames} frames, "
+                      f"{pipeline.dropped_results} results")
+    
+    def run_multiprocess(self):
+        """Capture into shared memory, detect in worker processes and render results in order"""
+        from shm_detection import SharedMemoryDetector
+        
+        first_frame = self.camera.get_frame()
+        if first_frame is None:
+            print("Failed to get frame")
+            return
+        
+        pool = SharedMemoryDetector(first_frame.shape).start()
+        try:
+            capturing = True
+            while capturing or pool.in_flight:
+                # Capture straight into a free shared-memory slot
+                slot = pool.acquire_slot() if capturing else None
+                if slot is not None:
+                    if self.camera.get_frame_into(pool.frame(slot)) is None:
+                        print("Failed to get frame")
+                        pool.release_slot(slot)
+                        capturing = False
+                    else:
+                        pool.submit(slot)
+                
+                # Wait for results only when no slot is free to capture into
+                item = pool.get_result(block=slot is None)
+                if item is None:
+                    continue
+                
+                seq, slot, normalized, hand_types = item
+                frame = pool.frame(slot)
+                try:
+                    h, w = frame.shape[:2]
+                    landmarks = normalized * np.array([w, h, w], dtype=np.float32)
+                    with profiler.span("gesture"):
+                        hands = analyze_hands(landmarks, hand_types, frame.shape, self.finger_counter,
+                                              self.gesture_recognizer, self.hand_tracker,
+                                              motion_recognizer=self.motion_recognizer)
+                    self.record_landmarks(frame, normalized, hand_types)
+                    self.draw_frame(frame, hands, landmarks)
+                    self.record_media(frame, hands)
+                    
+                    if not self.show_frame(frame):
+                        break
+                finally:
+                    pool.release_slot(slot)
+                profiler.maybe_dump()
+                metrics.maybe_dump()
+        finally:
+            pool.stop()
+    
+    def process_frame(self, frame):
+        """Detect hands and recognize gestures, returning per-hand info and the (hands, 21, 3) pixel landmarks"""
+        start_time = time.perf_counter()
+        
+        if self.gate is not None and not self.gate.should_detect(frame):
+            # Nothing moving and no hands last time: skip detection
+            landmarks = np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32)
+        elif self.scheduler is None:
+            # Detect hands
+            self.detector.detect_hands(frame)
+            
+            # Get landmarks for all hands as one (hands, 21, 3) array
+            landmarks = self.detector.get_landmarks_array(frame)
+        else:
+            landmarks = self.detect_scheduled(frame)
+        
+        if self.gate is not None:
+            self.gate.observe(len(landmarks))
+            DETECTOR_DUTY.set(self.gate.duty_cycle)
+        
+        # Count fingers and recognize gestures for all hands at once, with per-hand tracked state
+        with profiler.span("gesture"):
+            hand_types = [self.detector.get_hand_type(i) for i in range(len(landmarks))]
+            hands = analyze_hands(landmarks, hand_types, frame.shape, self.finger_counter,
+                                  self.gesture_recognizer, self.hand_tracker,
+                                  motion_recognizer=self.motion_recognizer)
+        
+        h, w = frame.shape[:2]
+        self.record_landmarks(frame, landmarks / np.array([w, h, w], dtype=np.float32), hand_types)
+        
+        process_time = time.perf_counter() - start_time
+        FRAME_LATENCY.labels(stage="process").observe(process_time)
+        if self.scheduler is not None:
+            self.scheduler.update(process_time)
+        
+        return hands, landmarks
+    
+    def record_landmarks(self, frame, normalized, hand_types):
+        """Append normalized landmarks to the session recording, if one is configured"""
+        if not RECORDING_FILE:
+            return
+        if self.recorder is None:
+            h, w = frame.shape[:2]
+            self.recorder = SessionRecorder(RECORDING_FILE, w, h)
+        self.recorder.write(normalized, hand_types)
+    
+    def detect_scheduled(self, frame):
+        """Detect hands at the scheduler's resolution, predicting landmarks on skipped frames"""
+        if self.scheduler.should_detect():
+            self.detector.detect_hands(self.scheduler.scale_frame(frame))
+            normalized = self.detector.get_normalized_landmarks()
+            self.scheduler.observe(normalized)
+        else:
+            normalized = self.scheduler.predict()
+        
+        h, w = frame.shape[:2]
+        return normalized * np.array([w, h, w], dtype=np.float32)
+    
+    @profiler.timed("overlay")
+    def draw_frame(self, frame, hands, landmarks):
+        """Draw hand info, landmarks and status overlay on frame
+
+        landmarks are the pixel landmarks the gestures were recognized from,
+        predicted ones included, so the drawing always matches the HUD.
+        """
+        for hand in hands:
+            i = hand["index"]
+            
+            # Draw hand info
+            y_offset = 50 + (i * 200)
+            
+            # Draw hand type
+            self.overlay.text(
+                f"Hand {i+1}: {hand['hand_type']}",
+                (frame.shape[1] - 250, y_offset),
+                text_color=(255, 255, 0),
+                bg_color=(0, 0, 0)
+            )
+            
+            # Draw finger count
+            self.overlay.text(
+                f"Fingers: {hand['finger_count']}",
+                (frame.shape[1] - 250, y_offset + 40),
+                text_color=(0, 255, 0),
+                bg_color=(0, 0, 0)
+            )
+            
+            # Draw gesture
+            self.overlay.text(
+                f"Gesture: {hand['gesture']}",
+                (frame.shape[1] - 250, y_offset + 80),
+                text_color=(0, 255, 255),
+                bg_color=(0, 0, 0)
+            )
+            
+            # Draw stable gesture
+            stable_gesture = hand["stable_gesture"]
+            if stable_gesture != "None":
+                self.overlay.text(
+                    f"Stable: {stable_gesture}",
+                    (frame.shape[1] - 250, y_offset + 120),
+                    text_color=(255, 255, 255),
+                    bg_color=(0, 128, 0)
+                )
+            
+            # Draw motion gesture for a moment after it completes
+            self.draw_motion_gesture(frame, hand, y_offset + 160)
+            
+            # Draw finger count at bottom
+            self.draw_bottom_finger_count(frame, hand["finger_count"], i)
+        
+        # Draw landmarks
+        draw_landmark_array(frame, landmarks)
+        
+        # Draw FPS
+        fps_color = get_fps_color(self.camera.fps)
+        self.overlay.text(
+            f"FPS: {int(self.camera.fps)}",
+            (10, 30),
+            text_color=fps_color,
+            bg_color=(0, 0, 0)
+        )
+        
+        # Draw hand count
+        self.overlay.text(
+            f"Hands: {len(hands)}",
+            (10, 70),
+            text_color=(255, 255, 255),
+            bg_color=(0, 0, 0)
+        )
+        
+        # Draw quality level when degraded
+        status_y = 110
+        if self.scheduler is not None and self.scheduler.level > 0:
+            self.overlay.text(
+                self.scheduler.describe(),
+                (10, status_y),
+                text_color=(0, 165, 255),
+                bg_color=(0, 0, 0)
+            )
+            status_y += 40
+        
+        # Draw detector duty cycle while the presence gate sleeps
+        if self.gate is not None and not self.gate.awake:
+            self.overlay.text(
+                self.gate.describe(),
+                (10, status_y),
+                text_color=(0, 165, 255),
+                bg_color=(0, 0, 0)
+            )
+        
+        # Blend queued HUD sprites onto the frame
+        self.overlay.compose(frame)
+        
+        # Draw latency breakdown
+        if self.show_profile:
+            profiler.draw(frame)
+        
+        return frame
+    
+    def record_media(self, frame, hands):
+        """Feed the clip ring and save a clip when a hand's stable gesture changes"""
+        if not MEDIA_CLIPS:
+            return
+        with profiler.span("media"):
+            self.media_writer.add_frame(frame)
+            for hand in hands:
+                gesture = hand["stable_gesture"]
+                if gesture != "None" and gesture != self.last_stable.get(hand["track_id"]):
+                    self.media_writer.trigger_clip(gesture)
+            self.last_stable = {hand["track_id"]: hand["stable_gesture"] for hand in hands}
+    
+    def show_frame(self, frame):
+        """Show frame and handle key presses, returning False when the app should quit"""
+        with profiler.span("display"):
+            cv2.imshow("Hand Gesture Recognition", frame)
+            key = cv2.waitKey(1) & 0xFF
+        
+        if not self.first_frame_shown:
+            self.first_frame_shown = True
+            startup.mark("first frame")
+            if self.startup_report:
+                startup.print_report()
+        
+        if key == ord('q'):
+            print("Quitting...")
+            return False
+        elif key == ord('s'):
+            self.save_screenshot(frame)
+        elif key == ord('p'):
+            self.show_profile = not self.show_profile
+            profiler.enabled = profiler.enabled or self.show_profile
+        return True
+    
+    def draw_motion_gesture(self, frame, hand, y):
+        """Queue the hand's latest motion gesture while it is still recent"""
+        track_id = hand["track_id"]
+        if hand["motion_gesture"]:
+            self.motion_labels[track_id] = (hand["motion_gesture"], time.time())
+        
+        label = self.motion_labels.get(track_id)
+        if label is None:
+            return
+        if time.time() - label[1] > MOTION_DISPLAY_TIME:
+            del self.motion_labels[track_id]
+            return
+        
+        self.overlay.text(
+            f"Motion: {label[0]}",
+            (frame.shape[1] - 250, y),
+            text_color=(255, 255, 255),
+            bg_color=(128, 0, 128)
+        )
+    
+    def draw_bottom_finger_count(self, frame, finger_count, hand_index=0):
+        """Queue finger count badge at bottom of frame (drawn by the next overlay compose)"""
+        h, w, _ = frame.shape
+        
+        # Position at bottom
+        x = 50 + (hand_index * 200)
+        y = h - 50
+        
+        # Draw circle with finger count
+        self.overlay.badge(finger_count, (x, y))
+        
+        # Draw label
+        self.overlay.label(f"Hand {hand_index + 1}", (x - 30, y - 40),
+                           font_scale=0.5, text_color=(255, 255, 255), thickness=1)
+    
+    def save_screenshot(self, frame):
+        """Save screenshot (encoded and written in the background)"""
+        self.media_writer.save_image(frame)
@@ -0,0 +1,188 @@
+import argparse
+import csv
+import os
+import cv2
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from hand_detector import HandDetector
+from finger_counter import FingerCounter
+from gesture_recognizer import GestureRecognizer
+from hand_features import HandFeatures
+from config import *
+
+FINGER_NAMES = ["thumb", "index", "middle", "ring", "pinky"]
+
+def iter_frames(path):
+    """Yield frames from a video file or a directory of images"""
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.lower().endswith(BATCH_IMAGE_EXTENSIONS):
+                frame = cv2.imread(os.path.join(path, name))
+                if frame is not None:
+                    yield frame
+        return
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise Exception(f"Cannot open video: {path}")
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+    finally:
+        cap.release()
+
+def iter_detections(path, detect_workers=DETECT_POOL_SIZE):
+    """Yield (frame, DetectionResult) for every frame of a source"""
+    if not os.path.isdir(path):
+        # Video frames are detected in order so tracking can carry over between them
+        detector = HandDetector()
+        try:
+            for frame in iter_frames(path):
+                detector.detect_hands(frame)
+                yield frame, detector.get_result(frame)
+        finally:
+            detector.close()
+        return
+
+    # Image folders have no temporal continuity, so detect images independently in parallel
+    detector = HandDetector(static_image_mode=True)
+    try:
+        batch = []
+        for frame in iter_frames(path):
+            batch.append(frame)
+            if len(batch) == DETECT_BATCH_SIZE:
+                yield from zip(batch, detector.detect_batch(batch, detect_workers))
+                batch = []
+        if batch:
+            yield from zip(batch, detector.detect_batch(batch, detect_workers))
+    finally:
+        detector.close()
+
+def process_source(path, detect_workers=DETECT_POOL_SIZE):
+    """Run detection, finger counting and gesture recognition over every frame of a source"""
+    finger_counter = FingerCounter()
+    gesture_recognizer = GestureRecognizer()
+
+    frame_hand_counts = []
+    frame_size = (0, 0)
+    frame_indices = []
+    hand_types = []
+    finger_counts = []
+    fingers = []
+    gestures = []
+    landmarks = []
+
+    for frame_index, (frame, result) in enumerate(iter_detections(path, detect_workers)):
+        hand_landmarks = result.get_landmarks_array()
+        features = HandFeatures(hand_landmarks)
+        counts, states = finger_counter.count_fingers_batch(hand_landmarks, features)
+
+        frame_hand_counts.append(result.hand_count)
+        frame_size = result.frame_size
+        frame_indices.extend([frame_index] * result.hand_count)
+        hand_types.extend(result.hand_types)
+        finger_counts.append(counts)
+        fingers.append(states)
+        gestures.extend(gesture_recognizer.classify_gestures(counts, hand_landmarks, states, features))
+        landmarks.append(result.landmarks)
+
+    return {
+        "frame_hand_counts": np.array(frame_hand_counts, dtype=np.int32),
+        "frame_size": np.array(frame_size, dtype=np.int32),
+        "frame_index": np.array(frame_indices, dtype=np.int32),
+        "hand_type": np.array(hand_types, dtype=str),
+        "finger_count": np.concatenate(finger_counts).astype(np.int32) if finger_counts else np.empty(0, np.int32),
+        "fingers": np.concatenate(fingers) if fingers else np.empty((0, 5), bool),
+        "gesture": np.array(gestures, dtype=str),
+        "landmarks": np.concatenate(landmarks) if landmarks else np.empty((0, NUM_LANDMARKS, 3), np.float32),
+    }
+
+def write_output(columns, output_path, output_format=BATCH_OUTPUT_FORMAT):
+    """Write per-hand columns to an .npz archive or a flat CSV file"""
+    if output_format == "npz":
+        np.savez_compressed(output_path, **columns)
+        return
+
+    if output_format != "csv":
+        raise ValueError(f"Unknown output format: {output_format}")
+
+    header = ["frame_index", "hand_type", "finger_count"]
+    header += [f"{name}_extended" for name in FINGER_NAMES]
+    header += ["gesture"]
+    header += [f"lm{i}_{axis}" for i in range(NUM_LANDMARKS) for axis in "xyz"]
+
+    with open(output_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        flat_landmarks = columns["landmarks"].reshape(-1, NUM_LANDMARKS * 3)
+        for row in range(len(columns["frame_index"])):
+            writer.writerow(
+                [columns["frame_index"][row], columns["hand_type"][row], columns["finger_count"][row]]
+                + columns["fingers"][row].astype(int).tolist()
+                + [columns["gesture"][row]]
+                + flat_landmarks[row].tolist()
+            )
+
+def output_names(paths, output_format=BATCH_OUTPUT_FORMAT):
+    """Get one distinct output file name per source
+
+    Sources are named after their base name without extension. Where base
+    names clash (a/session.mp4 and b/session.mp4, or x.mp4 and x.avi), the
+    path relative to the other sources is used instead, extension included.
+    """
+    stems = [os.path.splitext(os.path.basename(os.path.normpath(path)))[0] for path in paths]
+    common = os.path.commonpath([os.path.abspath(path) for path in paths]) if paths else ""
+    names = []
+    for path, stem in zip(paths, stems):
+        if stems.count(stem) > 1:
+            relative = os.path.relpath(os.path.abspath(path), common)
+            if relative == os.curdir:  # The same source given twice
+                relative = os.path.basename(os.path.normpath(path))
+            stem = relative.replace(os.sep, "_")
+        names.append(f"{stem}.{output_format}")
+
+    clashes = sorted({name for name in names if names.count(name) > 1})
+    if clashes:
+        raise ValueError(f"Sources would overwrite each other's output: {', '.join(clashes)}")
+    return names
+
+def process_file(path, output_dir, output_format=BATCH_OUTPUT_FORMAT, detect_workers=DETECT_POOL_SIZE,
+                 output_name=None):
+    """Process one source and write its output, returning the output path and frame count"""
+    columns = process_source(path, detect_workers)
+    output_path = os.path.join(output_dir, output_name or output_names([path], output_format)[0])
+    write_output(columns, output_path, output_format)
+    return output_path, len(columns["frame_hand_counts"])
+
+def process_files(paths, output_dir, output_format=BATCH_OUTPUT_FORMAT, workers=BATCH_WORKERS):
+    """Process sources across a pool of worker processes"""
+    names = output_names(paths, output_format)
+    os.makedirs(output_dir, exist_ok=True)
+    if workers == 1 or len(paths) == 1:
+        return [process_file(path, output_dir, output_format, output_name=name) for path, name in zip(paths, names)]
+
+    # Split the cores between processes so image folders do not oversubscribe them
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    detect_workers = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(process_file, path, output_dir, output_format, detect_workers, name)
+                   for path, name in zip(paths, names)]
+        return [future.result() for future in futures]
+
+def main():
+    parser = argparse.ArgumentParser(description="Label recorded videos or image folders offline")
+    parser.add_argument("inputs", nargs="+", help="Video files or image directories")
+    parser.add_argument("-o", "--output", default="batch_output", help="Output directory")
+    parser.add_argument("-f", "--format", choices=["npz", "csv"], default=BATCH_OUTPUT_FORMAT)
+    parser.add_argument("-w", "--workers", type=int, default=BATCH_WORKERS,
+                        help="Worker processes (default: one per CPU core)")
+    args = parser.parse_args()
+
+    for output_path, frame_count in process_files(args.inputs, args.output, args.format, args.workers):
+        print(f"Processed {frame_count} frames -> {output_path}")
+
+if __name__ == "__main__":
+    main()
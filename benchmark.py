@@ -0,0 +1,188 @@
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+import numpy as np
+from finger_counter import FingerCounter
+from gesture_recognizer import GestureRecognizer
+from hand_features import HandFeatures
+from profiler import profiler
+from config import *
+
+def synthetic_landmarks(num_frames, num_hands, seed=BENCHMARK_SEED):
+    """Generate a reproducible (frames, hands, 21, 3) normalized landmark sequence"""
+    rng = np.random.default_rng(seed)
+    # Random walk of hand centers plus per-landmark offsets around them
+    centers = 0.5 + np.cumsum(rng.normal(0, 0.005, (num_frames, num_hands, 1, 3)), axis=0)
+    offsets = rng.normal(0, 0.08, (num_frames, num_hands, NUM_LANDMARKS, 3))
+    landmarks = np.clip(centers + offsets, 0.0, 1.0)
+    landmarks[..., 2] -= 0.5
+    return landmarks.astype(np.float32)
+
+def load_landmark_fixture(path, num_hands):
+    """Load a batch_processor .npz output as a (frames, hands, 21, 3) landmark sequence"""
+    data = np.load(path)
+    frame_index = data["frame_index"]
+    landmarks = data["landmarks"]
+    frames = [landmarks[frame_index == i] for i in np.unique(frame_index)]
+    frames = [hands for hands in frames if len(hands) >= num_hands]
+    if not frames:
+        raise ValueError(f"No frames with {num_hands} hands in {path}")
+    return np.stack([hands[:num_hands] for hands in frames])
+
+def synthetic_frames(num_frames, width, height, seed=BENCHMARK_SEED):
+    """Generate reproducible BGR noise frames"""
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(num_frames)]
+
+def load_frames(path, num_frames, width, height):
+    """Load up to num_frames frames from a video or image folder, resized to width x height"""
+    import cv2
+    from batch_processor import iter_frames
+
+    frames = []
+    for frame in iter_frames(path):
+        frames.append(cv2.resize(frame, (width, height)))
+        if len(frames) >= num_frames:
+            break
+    if not frames:
+        raise ValueError(f"No frames found in {path}")
+    return frames
+
+def run_measured(name, func, frame_count, hand_count):
+    """Run func timed and profiled, then again under memory tracing, returning its throughput report
+
+    Tracing slows every allocation, so peak memory comes from a separate
+    run that is not timed.
+    """
+    profiler.reset()
+    profiler.enabled = True
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    profiler.enabled = False
+    stages = profiler.summary()
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "benchmark": name,
+        "frames": frame_count,
+        "hands": hand_count,
+        "seconds": elapsed,
+        "frames_per_sec": frame_count / elapsed if elapsed else 0.0,
+        "hands_per_sec": hand_count / elapsed if elapsed else 0.0,
+        "peak_memory_kb": peak / 1024,
+        "stages": stages,
+    }
+
+def bench_gestures(landmarks, width, height):
+    """Benchmark per-hand and batched finger counting and gesture recognition"""
+    pixels = landmarks * np.array([width, height, width], dtype=np.float32)
+    frame_count, hands_per_frame = pixels.shape[:2]
+    hand_count = frame_count * hands_per_frame
+    per_hand = [[[tuple(point) for point in hand[:, :2].astype(int).tolist()] for hand in frame] for frame in pixels]
+
+    def per_hand_loop():
+        finger_counter = FingerCounter()
+        gesture_recognizer = GestureRecognizer()
+        for frame in per_hand:
+            with profiler.span("gesture"):
+                for hand in frame:
+                    finger_count, _ = finger_counter.count_fingers(hand)
+                    gesture_recognizer.recognize_gesture(finger_count, hand)
+
+    def batched_loop():
+        finger_counter = FingerCounter()
+        gesture_recognizer = GestureRecognizer()
+        for frame in pixels:
+            with profiler.span("gesture"):
+                features = HandFeatures(frame)
+                counts, fingers = finger_counter.count_fingers_batch(frame, features)
+                gesture_recognizer.recognize_gestures(counts, frame, fingers, features)
+
+    return [
+        run_measured("gestures_per_hand", per_hand_loop, frame_count, hand_count),
+        run_measured("gestures_batched", batched_loop, frame_count, hand_count),
+    ]
+
+def bench_detector(frames):
+    """Benchmark hand detection and landmark conversion on recorded frames"""
+    from hand_detector import HandDetector
+
+    # Build the model before timing starts
+    detector = HandDetector().warm_up(background=False)
+    hand_count = [0]
+
+    def detect_loop():
+        count = 0
+        for frame in frames:
+            detector.detect_hands(frame)
+            count += len(detector.get_landmarks_array(frame))
+        hand_count[0] = count
+
+    report = run_measured("detector", detect_loop, len(frames), 0)
+    report["hands"] = hand_count[0]
+    report["hands_per_sec"] = hand_count[0] / report["seconds"] if report["seconds"] else 0.0
+    return report
+
+def print_report(report):
+    """Print one benchmark report"""
+    print(f"{report['benchmark']:<18} {report['resolution']:>10} hands/frame={report['hands_per_frame']:<2} "
+          f"{report['frames_per_sec']:10.1f} frames/s {report['hands_per_sec']:10.1f} hands/s "
+          f"peak {report['peak_memory_kb']:8.1f} KB")
+    for name, stats in report["stages"].items():
+        print(f"    {name:<20} p50 {stats['p50_ms']:7.3f} ms  p95 {stats['p95_ms']:7.3f} ms  "
+              f"p99 {stats['p99_ms']:7.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detection and gesture recognition without a camera")
+    parser.add_argument("--frames", help="Video file or image folder to replay through the detector")
+    parser.add_argument("--landmarks", help="batch_processor .npz output to replay through gesture logic")
+    parser.add_argument("--num-frames", type=int, default=BENCHMARK_FRAMES)
+    parser.add_argument("--hands", type=int, nargs="+", default=[1, MAX_HANDS])
+    parser.add_argument("--resolutions", nargs="+", default=[f"{CAMERA_WIDTH}x{CAMERA_HEIGHT}"])
+    parser.add_argument("--skip-detector", action="store_true", help="Only benchmark gesture logic")
+    parser.add_argument("--output", help="Write results as JSON for comparing builds")
+    args = parser.parse_args()
+
+    reports = []
+    for resolution in args.resolutions:
+        width, height = (int(v) for v in resolution.lower().split("x"))
+
+        for num_hands in args.hands:
+            if args.landmarks:
+                landmarks = load_landmark_fixture(args.landmarks, num_hands)
+            else:
+                landmarks = synthetic_landmarks(args.num_frames, num_hands)
+            for report in bench_gestures(landmarks, width, height):
+                report.update(resolution=resolution, hands_per_frame=num_hands)
+                reports.append(report)
+                print_report(report)
+
+        if not args.skip_detector:
+            if args.frames:
+                frames = load_frames(args.frames, args.num_frames, width, height)
+            else:
+                frames = synthetic_frames(args.num_frames, width, height)
+            report = bench_detector(frames)
+            report.update(resolution=resolution, hands_per_frame="-")
+            reports.append(report)
+            print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "results": reports,
+            }, f, indent=2)
+        print(f"Results saved: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from startup import lazy_import
+from config import *
+
+cv2 = lazy_import("cv2")
+
+CACHE_VERSION = 1
+
+def probe_camera(index, modes=CAMERA_PROBE_MODES):
+    """Open one camera index and record its backend and the modes it negotiates
+
+    Returns None when nothing answers at the index.
+    """
+    cap = cv2.VideoCapture(index)
+    try:
+        if not cap.isOpened():
+            return None
+        info = {
+            "index": index,
+            "backend": cap.getBackendName(),
+            "api": int(cap.get(cv2.CAP_PROP_BACKEND)),
+            "modes": [],
+        }
+        info["default_mode"] = read_mode(cap)
+
+        # Ask for each mode and keep what the driver actually gives us
+        for width, height, fps in modes:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            cap.set(cv2.CAP_PROP_FPS, fps)
+            mode = read_mode(cap)
+            if mode[0] > 0 and mode[1] > 0 and mode not in info["modes"]:
+                info["modes"].append(mode)
+        return info
+    finally:
+        cap.release()
+
+def read_mode(cap):
+    """Get the [width, height, fps] a capture is currently negotiated to"""
+    return [
+        int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        round(cap.get(cv2.CAP_PROP_FPS), 2),
+    ]
+
+def device_fingerprint():
+    """Identify the attached video devices, or None where they cannot be listed cheaply"""
+    if not sys.platform.startswith("linux"):
+        return None
+    paths = sorted(glob.glob("/dev/video*"))
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        # Device nodes are recreated when a camera is plugged in again
+        fingerprint.append([path, stat.st_rdev, stat.st_ctime])
+    return fingerprint
+
+def choose_mode(modes, width=CAMERA_WIDTH, height=CAMERA_HEIGHT, fps=CAMERA_FPS):
+    """Pick the fastest mode that still covers the requested resolution
+
+    Prefers modes reaching the requested frame rate, then the smallest of
+    those at least width x height (less to decode), then the highest frame rate.
+    """
+    if not modes:
+        return None
+    fast = [m for m in modes if m[2] >= fps] or [max(modes, key=lambda m: m[2])]
+    large = [m for m in fast if m[0] >= width and m[1] >= height]
+    if large:
+        return min(large, key=lambda m: (m[0] * m[1], -m[2]))
+    return max(fast, key=lambda m: (m[0] * m[1], m[2]))
+
+class CameraDiscovery:
+    """Probe camera indices concurrently and cache what was found on disk
+
+    The cache is reused while the probe settings and the attached devices
+    are unchanged. Where devices cannot be listed it expires after
+    CAMERA_CACHE_TTL seconds.
+    """
+
+    def __init__(self, cache_file=CAMERA_CACHE_FILE, indices=CAMERA_PROBE_INDICES,
+                 modes=CAMERA_PROBE_MODES, timeout=CAMERA_PROBE_TIMEOUT):
+        self.cache_file = cache_file
+        self.indices = list(indices)
+        self.modes = [list(mode) for mode in modes]
+        self.timeout = timeout
+        self.cameras = None
+        self.lock = threading.Lock()
+
+    def discover(self, refresh=False):
+        """Get info dicts for all available cameras, probing only when the cache is stale"""
+        with self.lock:
+            if self.cameras is None or refresh:
+                cached = None if refresh else self.load_cache()
+                if cached is None:
+                    cached = self.probe_all()
+                    self.save_cache(cached)
+                self.cameras = cached
+            return self.cameras
+
+    def get_camera(self, index):
+        """Get the info dict for one camera index, or None if it was not found"""
+        for camera in self.discover():
+            if camera["index"] == index:
+                return camera
+        return None
+
+    def probe_all(self):
+        """Probe every index at once, giving up on indices that do not answer in time"""
+        results = {}
+
+        def probe(index):
+            try:
+                results[index] = probe_camera(index, self.modes)
+            except Exception as e:
+                print(f"Camera {index} probe failed: {e}")
+
+        threads = [threading.Thread(target=probe, args=(index,), name=f"probe-{index}", daemon=True)
+                   for index in self.indices]
+        for thread in threads:
+            thread.start()
+
+        # Stuck opens are left behind on daemon threads
+        deadline = time.time() + self.timeout
+        for index, thread in zip(self.indices, threads):
+            thread.join(max(deadline - time.time(), 0))
+            if thread.is_alive():
+                print(f"Camera {index} probe timed out")
+
+        return [results[index] for index in self.indices if results.get(index)]
+
+    def cache_key(self):
+        """Everything the cached result depends on"""
+        return {"version": CACHE_VERSION, "indices": self.indices, "modes": self.modes,
+                "devices": device_fingerprint()}
+
+    def load_cache(self):
+        """Get cached cameras, or None if there is no valid cache"""
+        if not self.cache_file:
+            return None
+        try:
+            with open(self.cache_file, encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if cache.get("key") != self.cache_key():
+            return None
+        if cache["key"]["devices"] is None and time.time() - cache.get("created", 0) > CAMERA_CACHE_TTL:
+            return None
+        return cache.get("cameras")
+
+    def save_cache(self, cameras):
+        """Write cameras to the cache file, replacing it atomically"""
+        if not self.cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+            temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump({"key": self.cache_key(), "created": time.time(), "cameras": cameras}, f, indent=2)
+            os.replace(temp_file, self.cache_file)
+        except OSError as e:
+            print(f"Cannot write camera cache: {e}")
+
+    def invalidate(self):
+        """Forget cached results so the next discover() probes again"""
+        with self.lock:
+            self.cameras = None
+            if self.cache_file and os.path.exists(self.cache_file):
+                os.remove(self.cache_file)
+
+# Shared discovery for the whole process
+camera_discovery = CameraDiscovery()
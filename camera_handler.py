@@ -1,7 +1,13 @@
-import cv2
 import time
+from camera_discovery import camera_discovery, choose_mode
+from frame_buffer import FrameRing
+from metrics import FRAMES_CAPTURED
+from profiler import profiler
+from startup import lazy_import
 from config import *
 
+cv2 = lazy_import("cv2")
+
 class CameraHandler:
     def __init__(self, camera_id=CAMERA_ID):
         self.camera_id = camera_id
@@ -10,13 +16,29 @@ class CameraHandler:
         self.fps = 0
         self.frame_count = 0
         self.start_time = time.time()
+        self.raw_frame = None  # Reused capture buffer (before mirroring)
+        self.ring = None
         
     def initialize(self):
         """Initialize camera"""
-        self.cap = cv2.VideoCapture(self.camera_id)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
-        self.cap.set(cv2.CAP_PROP_FPS, CAMERA_FPS)
+        info = None
+        if CAMERA_DISCOVERY and isinstance(self.camera_id, int):
+            info = camera_discovery.get_camera(self.camera_id)
+        
+        mode = choose_mode(info["modes"]) if info else None
+        if mode is not None:
+            # Known backend and mode: no backend fallback or renegotiation
+            self.cap = cv2.VideoCapture(self.camera_id, info["api"])
+            self.set_mode(*mode)
+            if not self.cap.isOpened():
+                # The device changed since it was probed
+                self.cap.release()
+                camera_discovery.invalidate()
+                mode = None
+        
+        if mode is None:
+            self.cap = cv2.VideoCapture(self.camera_id)
+            self.set_mode(CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_FPS)
         
         if not self.cap.isOpened():
             raise Exception("Cannot open camera")
@@ -25,13 +47,40 @@ class CameraHandler:
         print(f"Camera initialized: {self.camera_id}")
         return True
     
+    def set_mode(self, width, height, fps):
+        """Request a capture resolution and frame rate"""
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.cap.set(cv2.CAP_PROP_FPS, fps)
+    
     def get_frame(self):
         """Get frame from camera"""
+        return self.read_frame(use_ring=False)
+    
+    def get_frame_into(self, dst):
+        """Get frame written into a caller-provided array of the camera's frame shape"""
+        return self.read_frame(use_ring=False, dst=dst)
+    
+    def get_frame_buffer(self):
+        """Get frame in a preallocated ring buffer, owned by the caller until release_frame()"""
+        return self.read_frame(use_ring=FRAME_RING_SIZE > 0)
+    
+    def release_frame(self, frame):
+        """Hand a frame from get_frame_buffer() back to the ring"""
+        if self.ring is not None and frame is not None:
+            self.ring.release(frame)
+    
+    def read_frame(self, use_ring, dst=None):
+        """Read a mirrored frame into dst, a ring buffer or a new array"""
         if self.cap is None or not self.is_running:
             return None
             
-        ret, frame = self.cap.read()
+        with profiler.span("capture"):
+            ret, raw = self.cap.read(self.raw_frame)
         if ret:
+            self.raw_frame = raw
+            FRAMES_CAPTURED.inc()
+            
             # Update FPS
             self.frame_count += 1
             elapsed_time = time.time() - self.start_time
@@ -40,8 +89,16 @@ class CameraHandler:
                 self.frame_count = 0
                 self.start_time = time.time()
             
+            if use_ring:
+                # (Re)size the ring to what the camera actually delivers
+                if self.ring is None or self.ring.shape != raw.shape:
+                    self.ring = FrameRing(raw.shape)
+                # Falls back to a new array when every buffer is still owned
+                dst = self.ring.acquire()
+            
             # Flip frame horizontally for mirror effect
-            frame = cv2.flip(frame, 1)
+            with profiler.span("flip"):
+                frame = cv2.flip(raw, 1, dst)
             return frame
         return None
     
@@ -52,12 +109,6 @@ class CameraHandler:
         self.is_running = False
         print("Camera released")
     
-    def get_available_cameras(self):
-        """Check available cameras"""
-        available_cameras = []
-        for i in range(5):  # Check first 5 camera indices
-            cap = cv2.VideoCapture(i)
-            if cap.isOpened():
-                available_cameras.append(i)
-                cap.release()
-        return available_cameras
\ No newline at end of file
+    def get_available_cameras(self, refresh=False):
+        """Check available cameras (probed in parallel and cached, see camera_discovery)"""
+        return [camera["index"] for camera in camera_discovery.discover(refresh)]
\ No newline at end of file
@@ -1,4 +1,5 @@
 # Configuration file for hand gesture recognition
+import os
 
 # Camera settings
 CAMERA_ID = 0
@@ -15,9 +16,10 @@ MAX_HANDS = 2
 # Gesture recognition settings
 GESTURE_HISTORY_LENGTH = 5
 GESTURE_STABLE_FRAMES = 10
+GESTURE_RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gestures.json")
 
 # UI settings
-FONT = cv2.FONT_HERSHEY_SIMPLEX
+FONT = 0  # cv2.FONT_HERSHEY_SIMPLEX; numeric so config does not need cv2
 FONT_SCALE = 0.7
 FONT_THICKNESS = 2
 TEXT_COLOR = (0, 255, 0)  # Green
@@ -46,6 +48,11 @@ PINKY_TIP = 20
 PINKY_PIP = 18
 PINKY_MCP = 17
 
+# Per-finger landmark indices (Thumb, Index, Middle, Ring, Pinky)
+NUM_LANDMARKS = 21
+FINGER_TIPS = [THUMB_TIP, INDEX_TIP, MIDDLE_TIP, RING_TIP, PINKY_TIP]
+FINGER_PIPS = [THUMB_IP, INDEX_PIP, MIDDLE_PIP, RING_PIP, PINKY_PIP]
+
 # Landmark indices for hand connections
 HAND_CONNECTIONS = [
     (0, 1), (1, 2), (2, 3), (3, 4),  # Thumb
@@ -54,4 +61,157 @@ HAND_CONNECTIONS = [
     (0, 13), (13, 14), (14, 15), (15, 16),  # Ring
     (0, 17), (17, 18), (18, 19), (19, 20),  # Pinky
     (5, 9), (9, 13), (13, 17)  # Palm
-]
\ No newline at end of file
+]
+
+# Pipeline settings
+PIPELINE_MODE = "serial"  # "serial", "pipelined" or "multiprocess"
+PIPELINE_QUEUE_SIZE = 1  # Bounded queue size between stages (oldest frames are dropped)
+PIPELINE_TIMEOUT = 0.1  # Seconds a stage waits for input before re-checking for shutdown
+
+# Batch processing settings
+BATCH_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+BATCH_OUTPUT_FORMAT = "npz"  # "npz" or "csv"
+BATCH_WORKERS = None  # Number of worker processes (None = one per CPU core)
+
+# Profiling settings
+PROFILE_ENABLED = False  # Record per-stage latencies
+PROFILE_OVERLAY = False  # Draw per-stage p50/p95/p99 on screen (toggle with 'p')
+PROFILE_WINDOW = 1000  # Number of recent samples kept per stage
+PROFILE_DUMP_FILE = None  # e.g. "profile.json" or "profile.csv"
+PROFILE_DUMP_INTERVAL = 10.0  # Seconds between dumps
+
+# Benchmark settings
+BENCHMARK_FRAMES = 300  # Frames replayed per benchmark run
+BENCHMARK_SEED = 0  # Seed for synthetic fixtures
+
+# ROI tracking settings
+ROI_TRACKING = False  # Detect in a region around the previous hands between keyframes
+ROI_KEYFRAME_INTERVAL = 30  # Frames between full-frame detections
+ROI_MARGIN = 0.25  # Region padding as a fraction of the hand box size on each side
+ROI_MAX_SIZE = 256  # Regions larger than this are downscaled before detection
+ROI_MIN_SIZE = 32  # Smaller regions fall back to full-frame detection
+ROI_MIN_CONFIDENCE = 0.8  # Handedness score below which tracking counts as lost
+
+# Adaptive quality settings
+ADAPTIVE_QUALITY = False  # Degrade resolution / detection rate when over budget
+TARGET_FPS = CAMERA_FPS  # Processing budget per frame is 1 / TARGET_FPS
+QUALITY_LEVELS = [  # (inference scale, run detection every Nth frame), best first
+    (1.0, 1),
+    (0.75, 1),
+    (0.75, 2),
+    (0.5, 2),
+    (0.5, 3),
+]
+QUALITY_SMOOTHING = 0.1  # Weight of the newest frame time in the running average
+QUALITY_HEADROOM = 0.7  # Step back up when running below this fraction of the budget
+QUALITY_ADJUST_FRAMES = 15  # Consecutive frames over/under budget before changing level
+
+# Multi-camera settings
+MULTI_CAMERA_WORKERS = None  # Shared detector workers (None = one per CPU core)
+MULTI_CAMERA_STATS_INTERVAL = 5.0  # Seconds between per-stream throughput reports
+
+# Hand tracking settings
+TRACK_MAX_DISTANCE = 0.2  # Max normalized center movement per frame to keep a hand's ID
+TRACK_MAX_AGE = 15  # Frames a hand can be missing before its ID and state are dropped
+
+# Overlay settings
+OVERLAY_CACHE_SIZE = 256  # Max cached HUD sprites (least recently used are evicted)
+
+# Frame buffer settings
+FRAME_RING_SIZE = 6  # Preallocated frame buffers; pipelined mode can hold 5 at once (0 = allocate per frame)
+RGB_BUFFER_SHAPES = 4  # Distinct image shapes HandDetector keeps color conversion buffers for
+
+# Multi-process detection settings (PIPELINE_MODE = "multiprocess")
+SHM_WORKERS = None  # Detector processes (None = CPU cores - 1)
+SHM_SLOTS = 8  # Shared-memory frame slots; bounds frames in flight
+
+# Event server settings
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_PREVIEW_FPS = 5  # Max MJPEG preview rate
+SERVER_PREVIEW_QUALITY = 70  # Preview JPEG quality
+
+# Recording settings
+RECORDING_FILE = None  # e.g. "session.hgrec" to record landmarks from the live loop
+RECORDING_BUFFER_SIZE = 1 << 20  # Write buffer in bytes
+RECORDING_CHUNK_FRAMES = 65536  # Frames classified per batch when replaying
+
+# Learned gesture classifier settings
+GESTURE_BACKEND = "rules"  # "rules" (gestures.json) or "model" (trained classifier)
+GESTURE_MODEL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gesture_model.npz")
+GESTURE_MODEL_MIN_CONFIDENCE = 0.6  # Below this probability a hand is classified "Unknown"
+
+# Landmark smoothing settings
+LANDMARK_SMOOTHING = False  # One Euro filter per tracked hand before counting and classification
+ONE_EURO_MIN_CUTOFF = 1.0  # Hz; lower = less jitter when still, more lag
+ONE_EURO_BETA = 0.05  # Higher = less lag during fast motion
+ONE_EURO_D_CUTOFF = 1.0  # Hz; cutoff for the speed estimate
+SMOOTHED_HISTORY_LENGTH = 2  # Gesture history used instead of GESTURE_HISTORY_LENGTH when smoothing
+SMOOTHED_STABLE_FRAMES = 1  # Used instead of GESTURE_STABLE_FRAMES when smoothing
+
+# Motion gesture settings
+MOTION_GESTURES = False  # Recognize swipes, circles, waves and pinch-drags from hand trajectories
+MOTION_TEMPLATES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "motion_gestures.json")
+MOTION_HISTORY_LENGTH = 32  # Frames of palm position kept per hand
+MOTION_TEMPLATE_FPS = 15  # Template sampling rate; motions may run up to 2x faster than this
+MOTION_VELOCITY_LAG = 2  # Frames between positions used for velocity
+MOTION_SPEED_SCALE = 2.0  # Palm sizes per second at which speed features reach half strength
+MOTION_PINCH_THRESHOLD = 0.4  # Thumb-index distance (in palm sizes) counted as a pinch
+MOTION_PINCH_WEIGHT = 1.0  # Weight of the pinch feature for templates that specify one
+MOTION_MATCH_THRESHOLD = 0.25  # Max mean alignment cost for a match
+MOTION_ABANDON_COST = 0.5  # Partial alignments with a higher mean cost are dropped
+MOTION_MAX_GAP = 0.25  # Seconds without a hand before its trajectory restarts
+MOTION_DISPLAY_TIME = 1.0  # Seconds a motion gesture stays on screen
+
+# Startup settings
+DETECTOR_WARMUP = True  # Build the detection model in the background while the camera opens
+STARTUP_REPORT = False  # Print how long each startup phase took once the first frame is shown
+
+# Camera discovery settings
+CAMERA_DISCOVERY = False  # Open cameras in a mode chosen from cached probe results (probes every index on first use)
+CAMERA_PROBE_INDICES = [0, 1, 2, 3, 4]  # Device indices probed (all at once)
+CAMERA_PROBE_MODES = [(320, 240, 30), (640, 480, 30), (640, 480, 60), (1280, 720, 30), (1280, 720, 60), (1920, 1080, 30)]
+CAMERA_PROBE_TIMEOUT = 5.0  # Seconds to wait for all probes
+CAMERA_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "hand_gesture", "cameras.json")  # None = no cache
+CAMERA_CACHE_TTL = 24 * 3600  # Seconds, only where attached devices cannot be listed (not Linux)
+
+# Presence gate settings
+PRESENCE_GATE = False  # Skip hand detection while nothing moves in front of the camera
+GATE_SIZE = (80, 60)  # Thumbnail (width, height) compared between frames
+GATE_DIFF_THRESHOLD = 12  # Gray level change counted as motion
+GATE_MOTION_FRACTION = 0.01  # Fraction of changed thumbnail pixels that wakes the detector
+GATE_HOLD_FRAMES = 30  # Frames without motion or hands before the detector sleeps
+GATE_IDLE_INTERVAL = 15  # While asleep, still detect every Nth frame
+GATE_SKIN = False  # Only count motion on skin-colored pixels
+GATE_SKIN_LOWER = (0, 133, 77)  # YCrCb skin range
+GATE_SKIN_UPPER = (255, 173, 127)
+GATE_DUTY_SMOOTHING = 0.02  # Smoothing of the recent duty cycle
+
+# Batched detection settings
+DETECT_POOL_SIZE = None  # Graphs (and threads) used by HandDetector.detect_batch (None = CPU cores)
+DETECT_BATCH_SIZE = 32  # Images per detect_batch call in batch processing
+
+# Media writer settings
+MEDIA_OUTPUT_DIR = "."  # Where screenshots and clips are written
+MEDIA_IMAGE_FORMAT = "jpg"  # "jpg", "png" or "webp"
+MEDIA_IMAGE_QUALITY = 90  # JPEG / WebP quality
+MEDIA_QUEUE_SIZE = 8  # Pending writes before new ones are dropped
+MEDIA_CLOSE_TIMEOUT = 10.0  # Seconds to wait for pending writes on exit
+MEDIA_CLIPS = False  # Save a clip whenever a hand's stable gesture changes
+MEDIA_CLIP_PREROLL = 2.0  # Seconds kept before the gesture change
+MEDIA_CLIP_POSTROLL = 2.0  # Seconds collected after it
+MEDIA_CLIP_MAX_FPS = 30  # Frame rate the pre-roll ring is sized for
+MEDIA_CLIP_SCALE = 0.5  # Clip resolution relative to the camera frame
+MEDIA_CLIP_FORMAT = "mp4"
+MEDIA_CLIP_CODEC = "mp4v"  # FourCC
+
+# Metrics settings
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = None  # Serve Prometheus metrics at /metrics on this port (None = off)
+METRICS_FILE = None  # e.g. "/var/lib/node_exporter/hand_gesture.prom" for periodic snapshots
+METRICS_DUMP_INTERVAL = 15.0  # Seconds between snapshots
+METRICS_LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]  # Seconds
+
+# Hand feature settings (distances are in palm sizes, wrist to middle finger MCP)
+FINGER_EXTENSION_THRESHOLD = 0.5  # Cosine between a finger (MCP to tip) and its palm bone above which it counts as extended
+THUMB_REACH_THRESHOLD = 0.3  # How far past the index knuckle, away from the pinky, an extended thumb reaches
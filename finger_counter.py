@@ -1,5 +1,6 @@
+import numpy as np
 from config import *
-from utils import calculate_distance, is_point_above, is_point_right
+from hand_features import HandFeatures
 
 class FingerCounter:
     def __init__(self):
@@ -8,45 +9,28 @@ class FingerCounter:
         
     def count_fingers(self, landmarks):
         """Count fingers based on landmarks"""
-        if not landmarks or len(landmarks) < 21:
+        if landmarks is None or len(landmarks) < NUM_LANDMARKS:
             return 0, [False] * 5
         
-        fingers = []
+        self.count_fingers_batch(np.asarray(landmarks)[np.newaxis])
         
-        # Thumb
-        if is_point_right(landmarks[THUMB_TIP], landmarks[THUMB_IP]):
-            fingers.append(True)
-        else:
-            fingers.append(False)
-        
-        # Index finger
-        if is_point_above(landmarks[INDEX_TIP], landmarks[INDEX_PIP]):
-            fingers.append(True)
-        else:
-            fingers.append(False)
-        
-        # Middle finger
-        if is_point_above(landmarks[MIDDLE_TIP], landmarks[MIDDLE_PIP]):
-            fingers.append(True)
-        else:
-            fingers.append(False)
-        
-        # Ring finger
-        if is_point_above(landmarks[RING_TIP], landmarks[RING_PIP]):
-            fingers.append(True)
-        else:
-            fingers.append(False)
-        
-        # Pinky finger
-        if is_point_above(landmarks[PINKY_TIP], landmarks[PINKY_PIP]):
-            fingers.append(True)
-        else:
-            fingers.append(False)
+        return self.finger_count, self.fingers_status
+    
+    def count_fingers_batch(self, landmarks, features=None):
+        """Count fingers for all hands at once from a (hands, 21, 2|3) landmark array
+
+        features is the frame's HandFeatures, if already computed.
+        """
+        if features is None:
+            features = HandFeatures(landmarks)
+        fingers = features.extended
+        counts = fingers.sum(axis=1)
         
-        self.fingers_status = fingers
-        self.finger_count = sum(fingers)
+        if len(landmarks):
+            self.fingers_status = fingers[-1].tolist()
+            self.finger_count = int(counts[-1])
         
-        return self.finger_count, fingers
+        return counts, fingers
     
     def get_finger_count(self):
         """Get current finger count"""
@@ -0,0 +1,43 @@
+import threading
+from collections import deque
+import numpy as np
+from config import *
+
+class FrameRing:
+    """Preallocated frame buffers handed out with explicit ownership
+
+    acquire() gives the caller a buffer it owns until it calls release().
+    When every buffer is owned, acquire() returns None.
+    """
+
+    def __init__(self, shape, size=FRAME_RING_SIZE, dtype=np.uint8):
+        self.shape = tuple(shape)
+        self.buffers = [np.empty(shape, dtype=dtype) for _ in range(size)]
+        self.slots = {id(buffer): i for i, buffer in enumerate(self.buffers)}
+        self.free = deque(range(size))
+        self.lock = threading.Lock()
+        self.exhausted = 0
+
+    def acquire(self):
+        """Take ownership of a free buffer, or None if all are in use"""
+        with self.lock:
+            if not self.free:
+                self.exhausted += 1
+                return None
+            return self.buffers[self.free.popleft()]
+
+    def release(self, buffer):
+        """Return a buffer to the ring; buffers not from this ring are ignored"""
+        slot = self.slots.get(id(buffer))
+        if slot is None or self.buffers[slot] is not buffer:
+            return False
+        with self.lock:
+            if slot in self.free:
+                raise ValueError("Frame buffer released twice")
+            self.free.append(slot)
+        return True
+
+    def owns(self, buffer):
+        """Check if buffer belongs to this ring"""
+        slot = self.slots.get(id(buffer))
+        return slot is not None and self.buffers[slot] is buffer
@@ -0,0 +1,182 @@
+import argparse
+import os
+import numpy as np
+from config import *
+from hand_features import HandFeatures
+
+def landmark_features(landmarks):
+    """Scale-invariant features from a (hands, 21, 2|3) pixel landmark array
+
+    Landmarks are centered on the wrist and divided by palm size (wrist to
+    middle finger MCP), then joined with the normalized pairwise fingertip
+    distances.
+    """
+    return HandFeatures(landmarks).vector()
+
+class GestureModel:
+    """Small MLP gesture classifier evaluated in NumPy over batches of hands"""
+
+    def __init__(self, weights, classes):
+        self.w1 = weights["w1"]
+        self.b1 = weights["b1"]
+        self.w2 = weights["w2"]
+        self.b2 = weights["b2"]
+        self.mean = weights["mean"]
+        self.std = weights["std"]
+        self.classes = np.array(classes)
+
+    @classmethod
+    def load(cls, path=GESTURE_MODEL_FILE):
+        """Load an exported model"""
+        data = np.load(path)
+        return cls({key: data[key].astype(np.float32) for key in ("w1", "b1", "w2", "b2", "mean", "std")},
+                   data["classes"].tolist())
+
+    def save(self, path):
+        """Export model weights"""
+        np.savez(path, w1=self.w1, b1=self.b1, w2=self.w2, b2=self.b2,
+                 mean=self.mean, std=self.std, classes=self.classes)
+
+    def predict_proba(self, landmarks, features=None):
+        """Get (hands, classes) probabilities for a (hands, 21, 2|3) pixel landmark array
+
+        features is the frame's HandFeatures, if already computed.
+        """
+        if features is None:
+            features = HandFeatures(landmarks)
+        features = (features.vector() - self.mean) / self.std
+        hidden = np.maximum(features @ self.w1 + self.b1, 0)
+        logits = hidden @ self.w2 + self.b2
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def predict(self, landmarks, min_confidence=GESTURE_MODEL_MIN_CONFIDENCE, features=None):
+        """Classify all hands, returning "Unknown" below min_confidence"""
+        if not len(landmarks):
+            return []
+        probabilities = self.predict_proba(landmarks, features)
+        best = probabilities.argmax(axis=1)
+        names = self.classes[best].astype(object)
+        names[probabilities[np.arange(len(best)), best] < min_confidence] = "Unknown"
+        return names.tolist()
+
+def train(landmarks, labels, hidden_size=64, epochs=200, batch_size=256, learning_rate=1e-3, seed=0):
+    """Train a GestureModel on (n, 21, 2|3) pixel landmarks and gesture labels with Adam"""
+    rng = np.random.default_rng(seed)
+    classes, targets = np.unique(np.asarray(labels), return_inverse=True)
+    features = landmark_features(landmarks)
+    mean = features.mean(axis=0)
+    std = features.std(axis=0) + 1e-6
+    features = (features - mean) / std
+
+    num_features, num_classes = features.shape[1], len(classes)
+    params = {
+        "w1": rng.normal(0, np.sqrt(2.0 / num_features), (num_features, hidden_size)),
+        "b1": np.zeros(hidden_size),
+        "w2": rng.normal(0, np.sqrt(1.0 / hidden_size), (hidden_size, num_classes)),
+        "b2": np.zeros(num_classes),
+    }
+    moments = {key: (np.zeros_like(value), np.zeros_like(value)) for key, value in params.items()}
+    step = 0
+
+    for epoch in range(epochs):
+        order = rng.permutation(len(features))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            x, y = features[batch], targets[batch]
+
+            # Forward
+            hidden = np.maximum(x @ params["w1"] + params["b1"], 0)
+            logits = hidden @ params["w2"] + params["b2"]
+            logits -= logits.max(axis=1, keepdims=True)
+            probabilities = np.exp(logits)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+
+            # Backward (softmax cross-entropy)
+            d_logits = probabilities
+            d_logits[np.arange(len(y)), y] -= 1
+            d_logits /= len(y)
+            d_hidden = (d_logits @ params["w2"].T) * (hidden > 0)
+            grads = {
+                "w1": x.T @ d_hidden,
+                "b1": d_hidden.sum(axis=0),
+                "w2": hidden.T @ d_logits,
+                "b2": d_logits.sum(axis=0),
+            }
+
+            # Adam update
+            step += 1
+            for key, grad in grads.items():
+                m, v = moments[key]
+                m[:] = 0.9 * m + 0.1 * grad
+                v[:] = 0.999 * v + 0.001 * grad * grad
+                m_hat = m / (1 - 0.9 ** step)
+                v_hat = v / (1 - 0.999 ** step)
+                params[key] -= learning_rate * m_hat / (np.sqrt(v_hat) + 1e-8)
+
+    weights = {key: value.astype(np.float32) for key, value in params.items()}
+    weights["mean"] = mean.astype(np.float32)
+    weights["std"] = std.astype(np.float32)
+    return GestureModel(weights, classes.tolist())
+
+def parse_source(spec):
+    """Split a "path=Gesture" training source into (path, label); the label is None for a plain path"""
+    path, separator, label = spec.rpartition("=")
+    if not separator or os.path.exists(spec):
+        return spec, None
+    return path, label
+
+def load_training_data(sources, rule_labels=False):
+    """Load pixel landmarks and gesture labels from batch_processor .npz outputs
+
+    sources are (path, label) pairs. Every hand in a file given a label gets
+    that label. Otherwise the file's own "label" array is used, e.g. added
+    by an annotation tool. The rule engine's "gesture" column is only used
+    with rule_labels, since a model trained on it can at best copy the rules.
+    """
+    landmarks, labels = [], []
+    for path, label in sources:
+        data = np.load(path)
+        width, height = data["frame_size"] if "frame_size" in data else (CAMERA_WIDTH, CAMERA_HEIGHT)
+        landmarks.append(data["landmarks"] * np.array([width, height, width], dtype=np.float32))
+        if label is not None:
+            labels.append(np.full(len(data["landmarks"]), label))
+        elif "label" in data:
+            labels.append(data["label"].astype(str))
+        elif rule_labels:
+            labels.append(data["gesture"])
+        else:
+            raise ValueError(f"No labels in {path}: add a 'label' array, pass it as {path}=<gesture>, "
+                             "or use --rule-labels")
+    return np.concatenate(landmarks), np.concatenate(labels)
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a gesture classifier from labelled landmark data")
+    parser.add_argument("inputs", nargs="+",
+                        help="batch_processor .npz files with a 'label' array, or path=Gesture to label a whole file")
+    parser.add_argument("--rule-labels", action="store_true",
+                        help="Fall back to the rule engine's gesture column (the model can then only imitate the rules)")
+    parser.add_argument("-o", "--output", default=GESTURE_MODEL_FILE, help="Exported model file")
+    parser.add_argument("--hidden", type=int, default=64)
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--validation", type=float, default=0.2, help="Fraction held out for accuracy")
+    args = parser.parse_args()
+
+    landmarks, labels = load_training_data([parse_source(spec) for spec in args.inputs], args.rule_labels)
+    keep = (labels != "Unknown") & (labels != "")
+    landmarks, labels = landmarks[keep], labels[keep]
+
+    order = np.random.default_rng(0).permutation(len(labels))
+    split = int(len(order) * (1 - args.validation))
+    train_rows, test_rows = order[:split], order[split:]
+
+    model = train(landmarks[train_rows], labels[train_rows], hidden_size=args.hidden, epochs=args.epochs)
+    if len(test_rows):
+        predicted = np.array(model.predict(landmarks[test_rows], min_confidence=0.0))
+        print(f"Validation accuracy: {(predicted == labels[test_rows]).mean():.3f} on {len(test_rows)} hands")
+    model.save(args.output)
+    print(f"Model saved: {args.output} ({len(model.classes)} gestures)")
+
+if __name__ == "__main__":
+    main()
@@ -1,118 +1,100 @@
 import numpy as np
 from collections import deque
 from config import *
+from gesture_model import GestureModel
+from gesture_rules import GestureRuleEngine
+from hand_features import HandFeatures
+from metrics import GESTURE_TRANSITIONS
+
+class GestureState:
+    """Gesture history and stability state for one hand"""
+    __slots__ = ("gesture_history", "current_gesture", "stable_gesture", "stable_counter")
+    
+    def __init__(self, history_length=GESTURE_HISTORY_LENGTH):
+        self.gesture_history = deque(maxlen=history_length)
+        self.current_gesture = "None"
+        self.stable_gesture = "None"
+        self.stable_counter = 0
 
 class GestureRecognizer:
-    def __init__(self):
-        self.gesture_history = deque(maxlen=GESTURE_HISTORY_LENGTH)
+    def __init__(self, rules_file=GESTURE_RULES_FILE, backend=GESTURE_BACKEND, smoothed=LANDMARK_SMOOTHING):
+        self.rules = GestureRuleEngine(rules_file)
+        self.model = GestureModel.load() if backend == "model" else None
+        # Smoothed landmarks jitter less, so a much shorter stability window is enough
+        self.history_length = SMOOTHED_HISTORY_LENGTH if smoothed else GESTURE_HISTORY_LENGTH
+        self.stable_frames = SMOOTHED_STABLE_FRAMES if smoothed else GESTURE_STABLE_FRAMES
+        self.gesture_history = deque(maxlen=self.history_length)
         self.current_gesture = "None"
         self.stable_gesture = "None"
         self.stable_counter = 0
         
     def recognize_gesture(self, finger_count, hand_landmarks=None):
         """Recognize gesture based on finger count and hand position"""
-        
-        # Basic gestures based on finger count
-        if finger_count == 0:
-            gesture = "Fist"
-        elif finger_count == 1:
-            gesture = "Point"
-        elif finger_count == 2:
-            gesture = "Peace"
-        elif finger_count == 3:
-            gesture = "Three"
-        elif finger_count == 4:
-            gesture = "Four"
-        elif finger_count == 5:
-            gesture = "Open Hand"
+        if hand_landmarks is not None and len(hand_landmarks) >= NUM_LANDMARKS:
+            landmarks = np.asarray(hand_landmarks)[np.newaxis]
         else:
-            gesture = "Unknown"
+            landmarks = None
         
-        # Advanced gestures if landmarks are provided
-        if hand_landmarks and len(hand_landmarks) >= 21:
-            # Check for OK sign
-            if self.is_ok_sign(hand_landmarks):
-                gesture = "OK"
-            # Check for Thumbs Up
-            elif self.is_thumbs_up(hand_landmarks):
-                gesture = "Thumbs Up"
-            # Check for Thumbs Down
-            elif self.is_thumbs_down(hand_landmarks):
-                gesture = "Thumbs Down"
-            # Check for Victory sign with two fingers
-            elif finger_count == 2 and self.is_victory_sign(hand_landmarks):
-                gesture = "Victory"
-        
-        self.current_gesture = gesture
-        self.gesture_history.append(gesture)
-        
-        # Check if gesture is stable
-        if len(self.gesture_history) == GESTURE_HISTORY_LENGTH:
-            if all(g == gesture for g in self.gesture_history):
-                self.stable_counter += 1
-                if self.stable_counter >= GESTURE_STABLE_FRAMES:
-                    self.stable_gesture = gesture
-                    self.stable_counter = 0
-            else:
-                self.stable_counter = max(0, self.stable_counter - 1)
+        gesture = self.classify_gestures([finger_count], landmarks)[0]
+        self.update_history(gesture)
         
         return gesture
     
-    def is_ok_sign(self, landmarks):
-        """Check if hand shows OK sign"""
-        # Thumb tip close to index tip
-        thumb_index_distance = np.sqrt(
-            (landmarks[THUMB_TIP][0] - landmarks[INDEX_TIP][0])**2 +
-            (landmarks[THUMB_TIP][1] - landmarks[INDEX_TIP][1])**2
-        )
-        
-        # Other fingers extended
-        middle_finger_extended = landmarks[MIDDLE_TIP][1] < landmarks[MIDDLE_PIP][1]
-        ring_finger_extended = landmarks[RING_TIP][1] < landmarks[RING_PIP][1]
-        pinky_extended = landmarks[PINKY_TIP][1] < landmarks[PINKY_PIP][1]
-        
-        return thumb_index_distance < 50 and middle_finger_extended and ring_finger_extended and pinky_extended
+    def recognize_gestures(self, finger_counts, landmarks, fingers=None, features=None):
+        """Recognize gestures for all hands from a (hands, 21, 2|3) landmark array"""
+        gestures = self.classify_gestures(finger_counts, landmarks, fingers, features)
+        for gesture in gestures:
+            self.update_history(gesture)
+        return gestures
     
-    def is_thumbs_up(self, landmarks):
-        """Check if hand shows thumbs up"""
-        # Thumb above other fingers
-        thumb_up = landmarks[THUMB_TIP][1] < landmarks[THUMB_MCP][1]
-        
-        # All other fingers curled
-        index_curled = landmarks[INDEX_TIP][1] > landmarks[INDEX_PIP][1]
-        middle_curled = landmarks[MIDDLE_TIP][1] > landmarks[MIDDLE_PIP][1]
-        ring_curled = landmarks[RING_TIP][1] > landmarks[RING_PIP][1]
-        pinky_curled = landmarks[PINKY_TIP][1] > landmarks[PINKY_PIP][1]
-        
-        return thumb_up and index_curled and middle_curled and ring_curled and pinky_curled
+    def classify_gestures(self, finger_counts, landmarks=None, fingers=None, features=None):
+        """Classify gestures for a batch of hands without touching the gesture history
+
+        features is the frame's HandFeatures, shared with the finger counter
+        so the geometry is only computed once.
+        """
+        if landmarks is not None and len(landmarks):
+            if features is None:
+                features = HandFeatures(landmarks)
+            if self.model is not None:
+                return self.model.predict(landmarks, features=features)
+            return self.rules.classify(landmarks, fingers, features)
+        return self.rules.classify_counts(finger_counts)
     
-    def is_thumbs_down(self, landmarks):
-        """Check if hand shows thumbs down"""
-        # Thumb below other fingers
-        thumb_down = landmarks[THUMB_TIP][1] > landmarks[THUMB_MCP][1]
-        
-        # All other fingers curled
-        index_curled = landmarks[INDEX_TIP][1] > landmarks[INDEX_PIP][1]
-        middle_curled = landmarks[MIDDLE_TIP][1] > landmarks[MIDDLE_PIP][1]
-        ring_curled = landmarks[RING_TIP][1] > landmarks[RING_PIP][1]
-        pinky_curled = landmarks[PINKY_TIP][1] > landmarks[PINKY_PIP][1]
-        
-        return thumb_down and index_curled and middle_curled and ring_curled and pinky_curled
+    def create_state(self):
+        """Create per-hand gesture state sized for this recognizer"""
+        return GestureState(self.history_length)
     
-    def is_victory_sign(self, landmarks):
-        """Check if hand shows victory/peace sign"""
-        # Index and middle extended
-        index_extended = landmarks[INDEX_TIP][1] < landmarks[INDEX_PIP][1]
-        middle_extended = landmarks[MIDDLE_TIP][1] < landmarks[MIDDLE_PIP][1]
-        
-        # Ring and pinky curled
-        ring_curled = landmarks[RING_TIP][1] > landmarks[RING_PIP][1]
-        pinky_curled = landmarks[PINKY_TIP][1] > landmarks[PINKY_PIP][1]
+    def get_gesture_names(self):
+        """Get every gesture name this recognizer can return"""
+        names = self.rules.gesture_names.tolist()
+        if self.model is not None:
+            names += [name for name in self.model.classes.tolist() if name not in names]
+        return names
+    
+    def update_history(self, gesture, state=None):
+        """Add gesture to history and update the stable gesture
+
+        state is a GestureState for per-hand tracking; by default the
+        recognizer's own shared state is used.
+        """
+        state = state if state is not None else self
+        state.current_gesture = gesture
+        state.gesture_history.append(gesture)
         
-        # Index and middle spread apart
-        fingers_spread = abs(landmarks[INDEX_TIP][0] - landmarks[MIDDLE_TIP][0]) > 50
+        # Check if gesture is stable
+        if len(state.gesture_history) == state.gesture_history.maxlen:
+            if all(g == gesture for g in state.gesture_history):
+                state.stable_counter += 1
+                if state.stable_counter >= self.stable_frames:
+                    if gesture != state.stable_gesture:
+                        GESTURE_TRANSITIONS.labels(gesture=gesture).inc()
+                    state.stable_gesture = gesture
+                    state.stable_counter = 0
+            else:
+                state.stable_counter = max(0, state.stable_counter - 1)
         
-        return index_extended and middle_extended and ring_curled and pinky_curled and fingers_spread
+        return state.stable_gesture
     
     def get_current_gesture(self):
         """Get current gesture"""
@@ -0,0 +1,118 @@
+import json
+import numpy as np
+from config import *
+from hand_features import HandFeatures
+from utils import is_point_above, is_point_right
+
+# Geometric feature tests, each mapping (HandFeatures, landmark a, landmark b, threshold in palm sizes)
+# to a boolean mask. Directions do not depend on scale, so they are tested on pixel landmarks.
+FEATURE_TESTS = {
+    "above": lambda f, a, b, t: is_point_above(f.landmarks[:, a], f.landmarks[:, b]),
+    "right": lambda f, a, b, t: is_point_right(f.landmarks[:, a], f.landmarks[:, b]),
+    "distance_below": lambda f, a, b, t: f.distance(a, b) < t,
+    "distance_above": lambda f, a, b, t: f.distance(a, b) > t,
+    "dx_above": lambda f, a, b, t: np.abs(f.xy[0, :, a] - f.xy[0, :, b]) > t * f.palm_size,
+    "dy_above": lambda f, a, b, t: np.abs(f.xy[1, :, a] - f.xy[1, :, b]) > t * f.palm_size,
+}
+
+
+MAX_FEATURE_BITS = 16
+
+class GestureRuleEngine:
+    """Gesture rules declared as data and compiled into a lookup table
+
+    Each rule matches on a finger pattern ("1" extended, "0" curled, "*" any,
+    in Thumb, Index, Middle, Ring, Pinky order), a finger count and/or named
+    geometric features. Rules are checked in file order; the first match wins.
+    Feature thresholds are in palm sizes (wrist to middle finger MCP).
+    """
+
+    def __init__(self, rules_file=GESTURE_RULES_FILE):
+        with open(rules_file, encoding="utf-8") as f:
+            self.load(json.load(f))
+
+    def load(self, spec):
+        """Compile a rules spec into lookup tables"""
+        self.feature_names = list(spec.get("features", {}))
+        self.features = []
+        for name in self.feature_names:
+            feature = spec["features"][name]
+            if feature["type"] not in FEATURE_TESTS:
+                raise ValueError(f"Unknown feature type for '{name}': {feature['type']}")
+            self.features.append((
+                FEATURE_TESTS[feature["type"]],
+                feature["a"],
+                feature["b"],
+                feature.get("threshold", 0),
+            ))
+
+        num_bits = 5 + len(self.features)
+        if num_bits > MAX_FEATURE_BITS:
+            raise ValueError(f"Too many gesture features: {len(self.features)}")
+        self.bit_values = 1 << np.arange(num_bits, dtype=np.int32)
+
+        self.gesture_names = np.array([rule["name"] for rule in spec["gestures"]] + ["Unknown"])
+        unknown = len(self.gesture_names) - 1
+
+        # Lookup table over every combination of finger and feature bits
+        codes = np.arange(1 << num_bits)
+        bits = (codes[:, np.newaxis] >> np.arange(num_bits)) & 1
+        self.table = np.full(len(codes), unknown, dtype=np.int32)
+        # Count-only table for callers that have no landmarks
+        self.count_table = np.full(6, unknown, dtype=np.int32)
+
+        # Assign in reverse so earlier rules take priority
+        for index in reversed(range(len(spec["gestures"]))):
+            rule = spec["gestures"][index]
+            match = self.rule_mask(rule, bits)
+            self.table[match] = index
+            if set(rule) <= {"name", "count"} and "count" in rule:
+                self.count_table[rule["count"]] = index
+
+    def rule_mask(self, rule, bits):
+        """Get mask of lookup table codes matching a rule"""
+        match = np.ones(len(bits), dtype=bool)
+
+        pattern = rule.get("fingers", "*****")
+        if len(pattern) != 5:
+            raise ValueError(f"Finger pattern for '{rule['name']}' must have 5 entries")
+        for finger, state in enumerate(pattern):
+            if state != "*":
+                match &= bits[:, finger] == int(state)
+
+        if "count" in rule:
+            match &= bits[:, :5].sum(axis=1) == rule["count"]
+
+        for name, expected in rule.get("features", {}).items():
+            if name not in self.feature_names:
+                raise ValueError(f"Unknown feature in '{rule['name']}': {name}")
+            match &= bits[:, 5 + self.feature_names.index(name)] == int(expected)
+
+        return match
+
+    def compute_codes(self, landmarks, fingers=None, features=None):
+        """Compute lookup table codes for a (hands, 21, 2|3) landmark array
+
+        features is the frame's HandFeatures, if already computed.
+        """
+        if features is None:
+            features = HandFeatures(landmarks)
+        if fingers is None:
+            fingers = features.extended
+
+        bits = np.empty((len(features), len(self.bit_values)), dtype=np.int32)
+        bits[:, :5] = fingers
+        for bit, (test, a, b, threshold) in enumerate(self.features, start=5):
+            bits[:, bit] = test(features, a, b, threshold)
+        return bits @ self.bit_values
+
+    def classify(self, landmarks, fingers=None, features=None):
+        """Classify gestures for all hands"""
+        return self.gesture_names[self.table[self.compute_codes(landmarks, fingers, features)]].tolist()
+
+    def classify_counts(self, finger_counts):
+        """Classify gestures from finger counts alone"""
+        finger_counts = np.asarray(finger_counts)
+        valid = (finger_counts >= 0) & (finger_counts <= 5)
+        indices = np.where(valid, self.count_table[np.clip(finger_counts, 0, 5)], len(self.gesture_names) - 1)
+        return self.gesture_names[indices].tolist()
@@ -0,0 +1,380 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+from config import *
+from metrics import metrics, CONTENT_TYPE
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+HAND_TYPE_CODES = {"Left": 0, "Right": 1}
+
+class Client:
+    """One subscriber holding only the newest undelivered message (drop-to-latest)"""
+    __slots__ = ("stable_only", "binary", "with_landmarks", "pending", "ready", "last_stable", "dropped", "sent")
+
+    def __init__(self, stable_only=False, binary=False, with_landmarks=False):
+        self.stable_only = stable_only
+        self.binary = binary
+        self.with_landmarks = with_landmarks
+        self.pending = None
+        self.ready = asyncio.Event()
+        self.last_stable = None
+        self.dropped = 0
+        self.sent = 0
+
+    def offer(self, message):
+        """Replace any undelivered message with a newer one"""
+        if self.pending is not None:
+            self.dropped += 1
+        self.pending = message
+        self.ready.set()
+
+    async def next_message(self):
+        """Wait for the newest message"""
+        await self.ready.wait()
+        self.ready.clear()
+        message, self.pending = self.pending, None
+        self.sent += 1
+        return message
+
+class GestureServer:
+    """Run hand detection headless and stream gesture events to HTTP and WebSocket clients
+
+    Endpoints:
+        /ws            WebSocket events (?stable=1, ?format=binary, ?landmarks=1)
+        /events        Server-sent events with the same JSON payloads
+        /state         Latest event as JSON
+        /gestures      Gesture names, indexed by the ids used in binary events
+        /preview.mjpg  Low-rate MJPEG preview
+        /metrics       Prometheus metrics
+    """
+
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT, camera_id=CAMERA_ID):
+        self.host = host
+        self.port = port
+        self.camera_id = camera_id
+        self.clients = set()
+        self.preview_clients = set()
+        self.latest_event = None
+        self.gesture_names = []
+        self.loop = None
+        self.stop_event = threading.Event()
+        self.error = None  # Exception that stopped the detection thread
+
+    # Detection thread
+
+    def detection_loop(self):
+        """Capture and detect on a worker thread, publishing events to the event loop"""
+        from camera_handler import CameraHandler
+        from hand_detector import HandDetector
+        from finger_counter import FingerCounter
+        from gesture_recognizer import GestureRecognizer
+        from hand_tracker import HandTracker, analyze_hands
+        import cv2
+
+        camera = CameraHandler(self.camera_id)
+        try:
+            detector = HandDetector()
+            finger_counter = FingerCounter()
+            gesture_recognizer = GestureRecognizer()
+            hand_tracker = HandTracker()
+            gate = None
+            if PRESENCE_GATE:
+                from presence_gate import PresenceGate
+                gate = PresenceGate()
+            motion_recognizer = None
+            if MOTION_GESTURES:
+                from motion_gestures import MotionGestureRecognizer
+                motion_recognizer = MotionGestureRecognizer()
+            self.gesture_names = gesture_recognizer.get_gesture_names()
+            last_preview = 0.0
+            seq = 0
+
+            if DETECTOR_WARMUP:
+                detector.warm_up()
+            camera.initialize()
+            while not self.stop_event.is_set():
+                frame = camera.get_frame_buffer()
+                if frame is None:
+                    break
+                try:
+                    if gate is None or gate.should_detect(frame):
+                        detector.detect_hands(frame)
+                        normalized = detector.get_normalized_landmarks()
+                        if gate is not None:
+                            gate.observe(len(normalized))
+                    else:
+                        normalized = np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32)
+                    h, w = frame.shape[:2]
+                    landmarks = normalized * np.array([w, h, w], dtype=np.float32)
+                    hand_types = [detector.get_hand_type(i) for i in range(len(landmarks))]
+                    hands = analyze_hands(landmarks, hand_types, frame.shape, finger_counter,
+                                          gesture_recognizer, hand_tracker,
+                                          motion_recognizer=motion_recognizer)
+                    event = {"seq": seq, "timestamp": time.time(), "hands": hands, "landmarks": normalized}
+                    seq += 1
+                    self.loop.call_soon_threadsafe(self.publish, event)
+                    metrics.maybe_dump()
+
+                    # Encode preview only when someone is watching
+                    now = time.time()
+                    if self.preview_clients and now - last_preview >= 1.0 / SERVER_PREVIEW_FPS:
+                        last_preview = now
+                        ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, SERVER_PREVIEW_QUALITY])
+                        if ok:
+                            self.loop.call_soon_threadsafe(self.publish_preview, jpeg.tobytes())
+                finally:
+                    camera.release_frame(frame)
+        except Exception as e:
+            self.error = e
+            print(f"Detection stopped: {e}")
+        finally:
+            camera.release()
+            self.stop_event.set()
+
+    # Publishing (event loop thread)
+
+    def publish(self, event):
+        """Offer an event to every subscriber"""
+        self.latest_event = event
+        stable = tuple((hand["track_id"], hand["stable_gesture"]) for hand in event["hands"])
+        motion = any(hand["motion_gesture"] for hand in event["hands"])
+        for client in self.clients:
+            # Motion gestures are one-frame events, so stable-only clients always get them
+            if client.stable_only and not motion:
+                if stable == client.last_stable:
+                    continue
+                client.last_stable = stable
+            client.offer(event)
+
+    def publish_preview(self, jpeg):
+        """Offer a JPEG frame to every preview subscriber"""
+        for client in self.preview_clients:
+            client.offer(jpeg)
+
+    def encode_json(self, event, with_landmarks):
+        """Encode an event as compact JSON"""
+        hands = []
+        for i, hand in enumerate(event["hands"]):
+            hand = dict(hand)
+            if with_landmarks:
+                hand["landmarks"] = np.round(event["landmarks"][i], 4).tolist()
+            hands.append(hand)
+        payload = {"seq": event["seq"], "timestamp": event["timestamp"], "hands": hands}
+        return json.dumps(payload, separators=(",", ":"))
+
+    def encode_binary(self, event):
+        """Encode an event as a packed record
+
+        Header: seq (uint32), timestamp (float64), hand count (uint8).
+        Per hand: track id (uint32), hand type (uint8, 0 left / 1 right / 255 unknown),
+        finger bits (uint8), gesture id (uint16), stable gesture id (uint16),
+        then 21 x 3 float32 normalized landmarks.
+        """
+        parts = [struct.pack("<IdB", event["seq"], event["timestamp"], len(event["hands"]))]
+        for i, hand in enumerate(event["hands"]):
+            finger_bits = sum(1 << bit for bit, extended in enumerate(hand["fingers"]) if extended)
+            parts.append(struct.pack(
+                "<IBBHH",
+                hand["track_id"],
+                HAND_TYPE_CODES.get(hand["hand_type"], 255),
+                finger_bits,
+                self.gesture_id(hand["gesture"]),
+                self.gesture_id(hand["stable_gesture"]),
+            ))
+            parts.append(np.ascontiguousarray(event["landmarks"][i], dtype="<f4").tobytes())
+        return b"".join(parts)
+
+    def gesture_id(self, name):
+        """Get the binary id of a gesture name (0xFFFF when unknown or "None")"""
+        try:
+            return self.gesture_names.index(name)
+        except ValueError:
+            return 0xFFFF
+
+    # HTTP / WebSocket handling
+
+    async def handle_connection(self, reader, writer):
+        """Route one HTTP request"""
+        try:
+            request_line = (await reader.readline()).decode("latin-1").strip()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            parts = request_line.split()
+            if len(parts) < 2 or parts[0] != "GET":
+                await self.send_response(writer, "405 Method Not Allowed", "text/plain", b"GET only")
+                return
+            url = urlsplit(parts[1])
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+            if url.path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self.serve_websocket(reader, writer, headers, query)
+            elif url.path == "/events":
+                await self.serve_events(writer, query)
+            elif url.path == "/preview.mjpg":
+                await self.serve_preview(writer)
+            elif url.path == "/state":
+                body = self.encode_json(self.latest_event, True) if self.latest_event else "null"
+                await self.send_response(writer, "200 OK", "application/json", body.encode())
+            elif url.path == "/metrics":
+                await self.send_response(writer, "200 OK", CONTENT_TYPE, metrics.render().encode())
+            elif url.path == "/gestures":
+                await self.send_response(writer, "200 OK", "application/json", json.dumps(self.gesture_names).encode())
+            else:
+                await self.send_response(writer, "404 Not Found", "text/plain", b"Not found")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def send_response(self, writer, status, content_type, body):
+        """Send a complete HTTP response"""
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+    def make_client(self, query):
+        """Create a subscriber from query options"""
+        return Client(
+            stable_only=query.get("stable") == "1",
+            binary=query.get("format") == "binary",
+            with_landmarks=query.get("landmarks") == "1",
+        )
+
+    async def serve_events(self, writer, query):
+        """Stream events as server-sent events"""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n\r\n")
+        await writer.drain()
+        client = self.make_client(query)
+        self.clients.add(client)
+        try:
+            while not self.stop_event.is_set():
+                event = await client.next_message()
+                if event is None:
+                    break
+                writer.write(f"data: {self.encode_json(event, client.with_landmarks)}\n\n".encode())
+                await writer.drain()
+        finally:
+            self.clients.discard(client)
+
+    async def serve_preview(self, writer):
+        """Stream JPEG frames as multipart MJPEG"""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: multipart/x-mixed-replace; boundary=frame\r\n\r\n")
+        await writer.drain()
+        client = Client()
+        self.preview_clients.add(client)
+        try:
+            while not self.stop_event.is_set():
+                jpeg = await client.next_message()
+                if jpeg is None:
+                    break
+                writer.write(b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: "
+                             + str(len(jpeg)).encode() + b"\r\n\r\n" + jpeg + b"\r\n")
+                await writer.drain()
+        finally:
+            self.preview_clients.discard(client)
+
+    async def serve_websocket(self, reader, writer, headers, query):
+        """Upgrade to WebSocket and push events until the client closes"""
+        key = headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+        )
+        await writer.drain()
+
+        client = self.make_client(query)
+        self.clients.add(client)
+        closed = asyncio.ensure_future(self.read_until_close(reader))
+        try:
+            while not closed.done() and not self.stop_event.is_set():
+                waiter = asyncio.ensure_future(client.next_message())
+                await asyncio.wait([waiter, closed], return_when=asyncio.FIRST_COMPLETED)
+                if not waiter.done():
+                    waiter.cancel()
+                    break
+                event = waiter.result()
+                if event is None:
+                    break
+                if client.binary:
+                    writer.write(websocket_frame(self.encode_binary(event), opcode=0x2))
+                else:
+                    writer.write(websocket_frame(self.encode_json(event, client.with_landmarks).encode(), opcode=0x1))
+                await writer.drain()
+        finally:
+            self.clients.discard(client)
+            closed.cancel()
+
+    async def read_until_close(self, reader):
+        """Consume client frames until a close frame or disconnect"""
+        while True:
+            header = await reader.readexactly(2)
+            opcode = header[0] & 0x0F
+            length = header[1] & 0x7F
+            if length == 126:
+                length = struct.unpack(">H", await reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack(">Q", await reader.readexactly(8))[0]
+            if header[1] & 0x80:
+                await reader.readexactly(4)  # Mask key; payload content is ignored
+            await reader.readexactly(length)
+            if opcode == 0x8:
+                return
+
+    async def serve(self):
+        """Start the detection thread and serve clients until detection stops"""
+        self.loop = asyncio.get_running_loop()
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        print(f"Gesture server listening on http://{self.host}:{self.port}")
+        detection = threading.Thread(target=self.detection_loop, name="detection", daemon=True)
+        detection.start()
+        async with server:
+            while not self.stop_event.is_set():
+                await asyncio.sleep(PIPELINE_TIMEOUT)
+        # Wake subscribers so their handlers can finish
+        for client in list(self.clients) + list(self.preview_clients):
+            client.ready.set()
+        if self.error is not None:
+            raise self.error
+
+def websocket_frame(payload, opcode=0x1):
+    """Build an unmasked, unfragmented server WebSocket frame"""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack(">BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack(">BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack(">BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless hand gesture event server")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--camera", default=str(CAMERA_ID), help="Device index or video file")
+    args = parser.parse_args()
+
+    camera_id = int(args.camera) if args.camera.isdigit() else args.camera
+    try:
+        asyncio.run(GestureServer(args.host, args.port, camera_id).serve())
+    except KeyboardInterrupt:
+        print("Quitting...")
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,338 @@
-import cv2
-import mediapipe as mp
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from profiler import profiler
+from startup import lazy_import, startup
 from config import *
 
+# Imported on first use, so tools that never detect hands skip their import cost
+cv2 = lazy_import("cv2")
+mp = lazy_import("mediapipe")
+
+def results_to_array(results):
+    """Convert MediaPipe results to a (hands, 21, 3) float32 array in one bulk pass"""
+    if not (results and results.multi_hand_landmarks):
+        return np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32)
+    
+    hands = results.multi_hand_landmarks
+    values = (
+        value
+        for hand_landmarks in hands
+        for landmark in hand_landmarks.landmark
+        for value in (landmark.x, landmark.y, landmark.z)
+    )
+    return np.fromiter(
+        values, dtype=np.float32, count=len(hands) * NUM_LANDMARKS * 3
+    ).reshape(len(hands), NUM_LANDMARKS, 3)
+
+class DetectionResult(namedtuple("DetectionResult", ["landmarks", "hand_types", "scores", "frame_size"])):
+    """Immutable hand detection for one frame
+
+    landmarks is a read-only (hands, 21, 3) float32 array of normalized x, y, z;
+    hand_types and scores give each hand's handedness and its confidence.
+    frame_size is (width, height).
+    """
+    __slots__ = ()
+    
+    @classmethod
+    def from_results(cls, results, frame_shape):
+        """Build a result from MediaPipe output for a frame of the given shape"""
+        landmarks = results_to_array(results)
+        landmarks.flags.writeable = False
+        handedness = results.multi_handedness if results and results.multi_hand_landmarks else []
+        hand_types = tuple(hand.classification[0].label for hand in handedness)
+        scores = np.array([hand.classification[0].score for hand in handedness], dtype=np.float32)
+        scores.flags.writeable = False
+        return cls(landmarks, hand_types, scores, (frame_shape[1], frame_shape[0]))
+    
+    @property
+    def hand_count(self):
+        """Number of hands detected"""
+        return len(self.landmarks)
+    
+    def get_landmarks_array(self):
+        """Get (hands, 21, 3) float32 landmarks in pixel coordinates"""
+        w, h = self.frame_size
+        return self.landmarks * np.array([w, h, w], dtype=np.float32)
+    
+    def get_hand_type(self, hand_index=0):
+        """Get hand type (Left/Right)"""
+        return self.hand_types[hand_index] if hand_index < len(self.hand_types) else "Unknown"
+
 class HandDetector:
-    def __init__(self):
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=STATIC_IMAGE_MODE,
+    def __init__(self, static_image_mode=STATIC_IMAGE_MODE, roi_tracking=ROI_TRACKING):
+        self.static_image_mode = static_image_mode
+        self.hands = None  # MediaPipe graph, built on first use or by warm_up()
+        self.hands_lock = threading.Lock()
+        self.results = None
+        self.normalized_landmarks = None
+        self.rgb_buffers = {}  # Reused color conversion outputs, keyed by image shape
+        
+        # ROI tracking state
+        self.roi_tracking = roi_tracking and not static_image_mode
+        self.roi_hands = None
+        self.roi = None
+        self.frames_since_keyframe = 0
+        self.keyframe_count = 0
+        self.roi_frame_count = 0
+        
+        # Graphs shared by detect_batch() calls, each used by one thread at a time,
+        # and the worker threads running them (created by the first parallel call)
+        self.pool = queue.Queue()
+        self.pool_size = 0
+        self.pool_lock = threading.Lock()
+        self.executor = None
+    
+    def create_hands(self, static_image_mode=None):
+        """Create a MediaPipe Hands graph with the configured settings"""
+        return mp.solutions.hands.Hands(
+            static_image_mode=self.static_image_mode if static_image_mode is None else static_image_mode,
             max_num_hands=MAX_HANDS,
             min_detection_confidence=DETECTION_CONFIDENCE,
             min_tracking_confidence=TRACKING_CONFIDENCE
         )
-        self.mp_draw = mp.solutions.drawing_utils
-        self.results = None
+    
+    def get_hands(self):
+        """Get the main MediaPipe graph, building it if needed"""
+        if self.hands is None:
+            with self.hands_lock:
+                if self.hands is None:
+                    started = time.perf_counter()
+                    self.hands = self.create_hands()
+                    startup.record("detector model", started)
+        return self.hands
+    
+    def warm_up(self, background=True):
+        """Build the MediaPipe graph now, on a background thread by default"""
+        if background:
+            threading.Thread(target=self.get_hands, name="detector-warmup", daemon=True).start()
+        else:
+            self.get_hands()
+        return self
+    
+    def detect_batch(self, frames, workers=DETECT_POOL_SIZE):
+        """Detect hands in independent frames, returning one DetectionResult per frame
+
+        Frames are spread over a pool of single-image graphs on worker threads.
+        The threads are kept for later calls (sized by the first parallel call)
+        until close(). Does not touch the single-frame detection state, so
+        several threads can call this on one detector. A (frames, h, w, 3)
+        array is color converted in a single pass.
+        """
+        if not len(frames):
+            return []
+        threads = workers or os.cpu_count() or 1
+        workers = min(threads, len(frames))
+        
+        with profiler.span("color_convert"):
+            rgb_frames = self.convert_batch(frames)
+        
+        def detect(rgb_image):
+            graph = self.acquire_graph(workers)
+            try:
+                results = graph.process(rgb_image)
+            finally:
+                self.pool.put(graph)
+            return DetectionResult.from_results(results, rgb_image.shape)
+        
+        with profiler.span("inference"):
+            if workers == 1:
+                return [detect(rgb_image) for rgb_image in rgb_frames]
+            return list(self.get_executor(threads).map(detect, rgb_frames))
+    
+    def get_executor(self, threads):
+        """Get the detect_batch worker threads, starting them on first use"""
+        with self.pool_lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="detect")
+            return self.executor
+    
+    def close(self):
+        """Stop the detect_batch threads and release every MediaPipe graph"""
+        with self.pool_lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown()
+        
+        graphs = [graph for graph in (self.hands, self.roi_hands) if graph is not None]
+        while True:
+            try:
+                graphs.append(self.pool.get_nowait())
+            except queue.Empty:
+                break
+        self.hands = None
+        self.roi_hands = None
+        self.pool_size = 0
+        for graph in graphs:
+            graph.close()
+    
+    def convert_batch(self, frames):
+        """Convert BGR frames to read-only RGB, in one call for a 4D array"""
+        if isinstance(frames, np.ndarray) and frames.ndim == 4:
+            n, h, w, c = frames.shape
+            rgb_frames = np.empty(frames.shape, dtype=np.uint8)
+            cv2.cvtColor(frames.reshape(n * h, w, c), cv2.COLOR_BGR2RGB, rgb_frames.reshape(n * h, w, c))
+        else:
+            rgb_frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+        for rgb_image in rgb_frames:
+            rgb_image.flags.writeable = False
+        return rgb_frames
+    
+    def acquire_graph(self, max_graphs):
+        """Take a free pool graph, creating one while fewer than max_graphs exist"""
+        try:
+            return self.pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self.pool_lock:
+            create = self.pool_size < max_graphs
+            if create:
+                self.pool_size += 1
+        if create:
+            return self.create_hands(static_image_mode=True)
+        return self.pool.get()
+    
+    def get_result(self, frame):
+        """Get the last detect_hands() detection as an immutable DetectionResult"""
+        return DetectionResult.from_results(self.results, frame.shape)
         
     def detect_hands(self, frame):
         """Detect hands in frame"""
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        rgb_frame.flags.writeable = False
+        results = None
+        if self.roi is not None and self.frames_since_keyframe < ROI_KEYFRAME_INTERVAL:
+            results = self.detect_roi(frame)
+        
+        if results is None:
+            # Keyframe: full-frame detection
+            results = self.process_image(self.get_hands(), frame)
+            self.frames_since_keyframe = 0
+            self.keyframe_count += 1
+        else:
+            self.frames_since_keyframe += 1
+            self.roi_frame_count += 1
         
-        # Process frame
-        self.results = self.hands.process(rgb_frame)
+        self.results = results
+        self.normalized_landmarks = None
         
-        # Convert back to BGR
-        rgb_frame.flags.writeable = True
+        if self.roi_tracking:
+            self.roi = self.predict_roi(frame)
         
         return self.results
     
+    def process_image(self, hands, image):
+        """Run a MediaPipe Hands graph on a BGR image"""
+        # Convert BGR to RGB
+        with profiler.span("color_convert"):
+            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, self.get_rgb_buffer(image.shape))
+        rgb_image.flags.writeable = False
+        
+        # Process image
+        with profiler.span("inference"):
+            results = hands.process(rgb_image)
+        
+        rgb_image.flags.writeable = True
+        
+        return results
+    
+    def get_rgb_buffer(self, shape):
+        """Get the reusable RGB buffer for an image shape"""
+        buffer = self.rgb_buffers.get(shape)
+        if buffer is None:
+            if len(self.rgb_buffers) >= RGB_BUFFER_SHAPES:
+                self.rgb_buffers.clear()
+            buffer = self.rgb_buffers[shape] = np.empty(shape, dtype=np.uint8)
+        return buffer
+    
+    def predict_roi(self, frame):
+        """Predict a square (x, y, size) region covering all hands from the current landmarks"""
+        landmarks = self.get_normalized_landmarks()
+        if not len(landmarks):
+            return None
+        
+        h, w = frame.shape[:2]
+        x_min, y_min = landmarks[:, :, :2].min(axis=(0, 1)) * (w, h)
+        x_max, y_max = landmarks[:, :, :2].max(axis=(0, 1)) * (w, h)
+        
+        # Expand the box so the hand stays inside it while moving
+        size = int(max(x_max - x_min, y_max - y_min) * (1 + 2 * ROI_MARGIN))
+        size = min(size, w, h)
+        if size < ROI_MIN_SIZE:
+            return None
+        
+        x = int(np.clip((x_min + x_max - size) / 2, 0, w - size))
+        y = int(np.clip((y_min + y_max - size) / 2, 0, h - size))
+        return x, y, size
+    
+    def detect_roi(self, frame):
+        """Detect hands in the predicted region, returning None when tracking is lost"""
+        if self.roi_hands is None:
+            self.roi_hands = self.create_hands()
+        
+        h, w = frame.shape[:2]
+        x, y, size = self.roi
+        crop = frame[y:y + size, x:x + size]
+        if size > ROI_MAX_SIZE:
+            crop = cv2.resize(crop, (ROI_MAX_SIZE, ROI_MAX_SIZE), interpolation=cv2.INTER_AREA)
+        
+        results = self.process_image(self.roi_hands, crop)
+        
+        # Fall back to full-frame detection if hands were lost or confidence dropped
+        expected_hands = self.get_hand_count()
+        if not results.multi_hand_landmarks or len(results.multi_hand_landmarks) < expected_hands:
+            return None
+        if min(hand.classification[0].score for hand in results.multi_handedness) < ROI_MIN_CONFIDENCE:
+            return None
+        
+        # Map landmarks from the region back to full-frame normalized coordinates
+        for hand_landmarks in results.multi_hand_landmarks:
+            for landmark in hand_landmarks.landmark:
+                landmark.x = (x + landmark.x * size) / w
+                landmark.y = (y + landmark.y * size) / h
+                landmark.z = landmark.z * size / w
+        
+        return results
+    
+    def get_normalized_landmarks(self):
+        """Get (hands, 21, 3) float32 array of normalized x, y, z landmarks for all hands"""
+        if self.normalized_landmarks is None:
+            with profiler.span("landmark_conversion"):
+                self.normalized_landmarks = self.convert_landmarks()
+        return self.normalized_landmarks
+    
+    def convert_landmarks(self):
+        """Convert the current MediaPipe results to a (hands, 21, 3) float32 array"""
+        return results_to_array(self.results)
+    
+    def get_landmarks_array(self, frame):
+        """Get (hands, 21, 3) float32 array of landmarks in pixel coordinates for all hands"""
+        h, w = frame.shape[:2]
+        # z uses the same scale as x, as in MediaPipe
+        return self.get_normalized_landmarks() * np.array([w, h, w], dtype=np.float32)
+    
     def get_landmarks(self, frame, hand_index=0):
         """Get landmarks for specific hand"""
-        landmarks_list = []
-        
-        if self.results and self.results.multi_hand_landmarks:
-            if hand_index < len(self.results.multi_hand_landmarks):
-                hand_landmarks = self.results.multi_hand_landmarks[hand_index]
-                h, w, _ = frame.shape
-                
-                for landmark in hand_landmarks.landmark:
-                    x = int(landmark.x * w)
-                    y = int(landmark.y * h)
-                    landmarks_list.append((x, y))
-                    
-        return landmarks_list
-    
-    def draw_landmarks(self, frame):
+        landmarks = self.get_landmarks_array(frame)
+        if hand_index >= len(landmarks):
+            return []
+        return [tuple(point) for point in landmarks[hand_index, :, :2].astype(int).tolist()]
+    
+    def draw_landmarks(self, frame, results=None):
         """Draw hand landmarks on frame"""
-        if self.results and self.results.multi_hand_landmarks:
-            for hand_landmarks in self.results.multi_hand_landmarks:
+        results = results if results is not None else self.results
+        if results and results.multi_hand_landmarks:
+            mp_draw = mp.solutions.drawing_utils
+            for hand_landmarks in results.multi_hand_landmarks:
                 # Draw landmarks and connections
-                self.mp_draw.draw_landmarks(
+                mp_draw.draw_landmarks(
                     frame, 
                     hand_landmarks, 
-                    self.mp_hands.HAND_CONNECTIONS,
-                    self.mp_draw.DrawingSpec(color=LANDMARK_COLOR, thickness=2),
-                    self.mp_draw.DrawingSpec(color=CONNECTION_COLOR, thickness=2)
+                    mp.solutions.hands.HAND_CONNECTIONS,
+                    mp_draw.DrawingSpec(color=LANDMARK_COLOR, thickness=2),
+                    mp_draw.DrawingSpec(color=CONNECTION_COLOR, thickness=2)
                 )
         return frame
     
@@ -0,0 +1,122 @@
+import numpy as np
+from config import *
+
+WRIST = 0
+FINGER_MCPS = [INDEX_MCP, MIDDLE_MCP, RING_MCP, PINKY_MCP]
+TIP_PAIRS = np.triu_indices(len(FINGER_TIPS), k=1)
+EXTENSION_THRESHOLDS = np.array([THUMB_REACH_THRESHOLD] + [FINGER_EXTENSION_THRESHOLD] * 4, dtype=np.float32)
+
+def difference_matrix(pairs):
+    """Matrix taking (start, end) landmark differences with one matmul over a (..., 21) coordinate array"""
+    matrix = np.zeros((NUM_LANDMARKS, len(pairs)), dtype=np.float32)
+    for column, (start, end) in enumerate(pairs):
+        matrix[start, column] -= 1
+        matrix[end, column] += 1
+    return matrix
+
+# Vectors needed to classify, in blocks of five whose rows pair up:
+# thumb tip from index MCP with pinky MCP to index MCP (across the palm),
+# then wrist to each finger's MCP with that MCP to its tip. The last block
+# holds each first-block denominator: wrist to middle MCP (palm size) for
+# the thumb, and the wrist-to-MCP bones again for the fingers.
+VECTORS = difference_matrix([(INDEX_MCP, THUMB_TIP)] + [(WRIST, mcp) for mcp in FINGER_MCPS]
+                            + [(PINKY_MCP, INDEX_MCP)] + [(mcp, mcp + 3) for mcp in FINGER_MCPS]
+                            + [(WRIST, MIDDLE_MCP)] + [(WRIST, mcp) for mcp in FINGER_MCPS])
+PALM = 10
+# Bones of index to pinky, four per finger from the wrist
+BONES = difference_matrix([(start, start + 1 if start != WRIST else mcp) for mcp in FINGER_MCPS
+                           for start in (WRIST, mcp, mcp + 1, mcp + 2)])
+
+class HandFeatures:
+    """Scale-normalized geometry of every hand in one frame, shared by its consumers
+
+    Distances are divided by palm size (wrist to middle finger MCP), so
+    thresholds do not depend on how far the hand is from the camera. The
+    vectors classification needs come from one matmul up front; every other
+    feature is computed for all hands at once on first use and kept, so the
+    finger counter and the gesture recognizer never repeat work and nothing
+    unused is computed. Built from a single frame's landmarks and never
+    updated; build a new one for the next frame.
+
+    Features (for a batch of n hands):
+        palm_size     (n,) palm size in pixels
+        points        (n, 21, 2) wrist-centered landmarks in palm sizes
+        joint_angles  (n, 4, 3) bend at the MCP, PIP and DIP joints of index to pinky, 0 when straight (radians)
+        extension     (n, 5) extension score per finger
+        extended      (n, 5) mask of extended fingers
+        tip_distances (n, 5, 5) distances between fingertips in palm sizes
+    """
+    __slots__ = ("landmarks", "xy", "vectors", "lengths", "palm_size", "_points", "_joint_angles",
+                 "_extension", "_extended", "_tip_distances")
+
+    def __init__(self, landmarks):
+        self.landmarks = np.asarray(landmarks, dtype=np.float32)[:, :, :2]
+        self.xy = self.landmarks.transpose(2, 0, 1)  # (2, n, 21) pixel x and y
+        self.vectors = self.xy @ VECTORS
+        self.lengths = np.hypot(self.vectors[0], self.vectors[1])
+        self.palm_size = np.maximum(self.lengths[:, PALM], 1e-6)
+        self._points = None
+        self._joint_angles = None
+        self._extension = None
+        self._extended = None
+        self._tip_distances = None
+
+    def __len__(self):
+        return len(self.landmarks)
+
+    @property
+    def points(self):
+        if self._points is None:
+            self._points = (self.landmarks - self.landmarks[:, WRIST:WRIST + 1]) / self.palm_size[:, np.newaxis, np.newaxis]
+        return self._points
+
+    @property
+    def joint_angles(self):
+        if self._joint_angles is None:
+            # Bend at each joint is the angle between the bones meeting there
+            bx, by = (self.xy @ BONES).reshape(2, len(self.landmarks), 4, 4)
+            lengths = np.hypot(bx, by)
+            dots = bx[:, :, :-1] * bx[:, :, 1:] + by[:, :, :-1] * by[:, :, 1:]
+            cosines = dots / np.maximum(lengths[:, :, :-1] * lengths[:, :, 1:], 1e-6)
+            self._joint_angles = np.arccos(np.clip(cosines, -1.0, 1.0))
+        return self._joint_angles
+
+    @property
+    def extension(self):
+        if self._extension is None:
+            # A finger scores the cosine between its direction (MCP to tip) and
+            # the palm's (wrist to MCP): near 1 when extended, negative when
+            # curled. The thumb scores how far its tip reaches past the index
+            # knuckle along the pinky-to-index direction (in palm sizes), which
+            # follows the hand's own side instead of the image x axis, so left
+            # and right hands (and palm or back facing) are treated alike.
+            vx, vy = self.vectors
+            dots = vx[:, :5] * vx[:, 5:10] + vy[:, :5] * vy[:, 5:10]
+            self._extension = dots / np.maximum(self.lengths[:, 5:10] * self.lengths[:, 10:15], 1e-6)
+        return self._extension
+
+    @property
+    def extended(self):
+        if self._extended is None:
+            self._extended = self.extension > EXTENSION_THRESHOLDS
+        return self._extended
+
+    @property
+    def tip_distances(self):
+        if self._tip_distances is None:
+            tips = self.xy[:, :, FINGER_TIPS]
+            delta = tips[:, :, :, np.newaxis] - tips[:, :, np.newaxis]
+            self._tip_distances = np.hypot(delta[0], delta[1]) / self.palm_size[:, np.newaxis, np.newaxis]
+        return self._tip_distances
+
+    def distance(self, a, b):
+        """Get (n,) distances between landmarks a and b in palm sizes"""
+        if self._tip_distances is not None and a in FINGER_TIPS and b in FINGER_TIPS:
+            return self._tip_distances[:, FINGER_TIPS.index(a), FINGER_TIPS.index(b)]
+        delta = self.xy[:, :, a] - self.xy[:, :, b]
+        return np.hypot(delta[0], delta[1]) / self.palm_size
+
+    def vector(self):
+        """Get (n, 52) flat feature vectors: normalized landmarks, then each fingertip pair's distance"""
+        return np.concatenate([self.points.reshape(len(self.landmarks), -1),
+                               self.tip_distances[:, TIP_PAIRS[0], TIP_PAIRS[1]]], axis=1)
@@ -0,0 +1,131 @@
+import time
+import numpy as np
+from hand_features import HandFeatures
+from landmark_filter import OneEuroFilter
+from metrics import FRAMES_PROCESSED, HANDS_DETECTED
+from config import *
+
+# Series bound up front, keeping the label lookup out of the per-hand loop
+HANDS_BY_TYPE = {hand_type: HANDS_DETECTED.labels(hand_type=hand_type) for hand_type in ("Left", "Right", "Unknown")}
+
+class Track:
+    """State kept for one tracked hand"""
+    __slots__ = ("track_id", "hand_type", "center", "last_seen", "gesture_state", "landmark_filter", "motion_state")
+
+    def __init__(self, track_id, hand_type, center, frame_index):
+        self.track_id = track_id
+        self.hand_type = hand_type
+        self.center = center
+        self.last_seen = frame_index
+        # Created on first use by the consumers that need them
+        self.gesture_state = None
+        self.landmark_filter = None
+        self.motion_state = None
+
+class HandTracker:
+    """Give each hand a stable ID across frames by matching position and hand type"""
+
+    def __init__(self, max_distance=TRACK_MAX_DISTANCE, max_age=TRACK_MAX_AGE):
+        self.max_distance = max_distance
+        self.max_age = max_age
+        self.tracks = {}
+        self.next_id = 1
+        self.frame_index = 0
+
+    def update(self, centers, hand_types):
+        """Match (hands, 2) normalized hand centers to tracks, returning one Track per hand"""
+        self.frame_index += 1
+        centers = np.asarray(centers, dtype=np.float32).reshape(-1, 2)
+        tracks = list(self.tracks.values())
+        assigned = [None] * len(centers)
+
+        if tracks and len(centers):
+            # Distance from every hand to every track, excluding hand type mismatches
+            track_centers = np.array([t.center for t in tracks], dtype=np.float32)
+            distances = np.linalg.norm(centers[:, np.newaxis] - track_centers[np.newaxis], axis=2)
+            same_type = np.array([[t.hand_type == h for t in tracks] for h in hand_types])
+            distances[~same_type] = np.inf
+            distances[distances > self.max_distance] = np.inf
+
+            # Greedy matching, closest pairs first
+            matched_tracks = set()
+            for flat_index in np.argsort(distances, axis=None):
+                hand, track = divmod(int(flat_index), len(tracks))
+                if not np.isfinite(distances[hand, track]):
+                    break
+                if assigned[hand] is None and track not in matched_tracks:
+                    assigned[hand] = tracks[track]
+                    matched_tracks.add(track)
+
+        for hand, track in enumerate(assigned):
+            if track is None:
+                track = Track(self.next_id, hand_types[hand], centers[hand], self.frame_index)
+                self.tracks[track.track_id] = track
+                self.next_id += 1
+                assigned[hand] = track
+            track.center = centers[hand]
+            track.last_seen = self.frame_index
+
+        self.evict()
+        return assigned
+
+    def evict(self):
+        """Drop tracks that have not been seen for max_age frames"""
+        stale = [i for i, t in self.tracks.items() if self.frame_index - t.last_seen > self.max_age]
+        for track_id in stale:
+            del self.tracks[track_id]
+
+def analyze_hands(landmarks, hand_types, frame_shape, finger_counter, gesture_recognizer, tracker,
+                  timestamp=None, smoothing=LANDMARK_SMOOTHING, motion_recognizer=None):
+    """Count fingers, classify gestures and update per-hand tracked state for all hands
+
+    landmarks is a (hands, 21, 3) pixel array. Returns one info dict per hand.
+    With smoothing, each tracked hand's landmarks pass through its own
+    One Euro filter before counting and classification. With a motion
+    recognizer, each hand's "motion_gesture" is set on the frame a motion
+    gesture completes.
+    """
+    h, w = frame_shape[:2]
+    centers = landmarks[:, :, :2].mean(axis=1) / np.array([w, h], dtype=np.float32)
+    tracks = tracker.update(centers, hand_types)
+
+    timestamp = time.perf_counter() if timestamp is None else timestamp
+    if smoothing and len(tracks):
+        smoothed = np.empty_like(landmarks, dtype=np.float32)
+        for i, track in enumerate(tracks):
+            if track.landmark_filter is None:
+                track.landmark_filter = OneEuroFilter()
+            smoothed[i] = track.landmark_filter(landmarks[i], timestamp)
+        landmarks = smoothed
+
+    # Geometry for this frame, shared by the finger counter and the recognizer
+    features = HandFeatures(landmarks)
+    finger_counts, fingers = finger_counter.count_fingers_batch(landmarks, features)
+    gestures = gesture_recognizer.classify_gestures(finger_counts, landmarks, fingers, features)
+
+    FRAMES_PROCESSED.inc()
+    hands = []
+    for i, track in enumerate(tracks):
+        hands_detected = HANDS_BY_TYPE.get(hand_types[i])
+        if hands_detected is None:
+            hands_detected = HANDS_DETECTED.labels(hand_type=hand_types[i])
+        hands_detected.inc()
+        if track.gesture_state is None:
+            track.gesture_state = gesture_recognizer.create_state()
+        stable_gesture = gesture_recognizer.update_history(gestures[i], track.gesture_state)
+        motion_gesture = None
+        if motion_recognizer is not None:
+            if track.motion_state is None:
+                track.motion_state = motion_recognizer.create_state()
+            motion_gesture = motion_recognizer.update(landmarks[i], timestamp, track.motion_state)
+        hands.append({
+            "index": i,
+            "track_id": track.track_id,
+            "hand_type": hand_types[i],
+            "finger_count": int(finger_counts[i]),
+            "fingers": fingers[i].tolist(),
+            "gesture": gestures[i],
+            "stable_gesture": stable_gesture,
+            "motion_gesture": motion_gesture,
+        })
+    return hands
@@ -0,0 +1,46 @@
+import numpy as np
+from config import *
+
+class OneEuroFilter:
+    """One Euro filter over a whole landmark array with constant cost per update
+
+    Low speeds get a low cutoff (less jitter); fast motion raises the cutoff
+    through beta (less lag). min_cutoff is in Hz, beta in 1 / (pixels per second).
+    """
+    __slots__ = ("min_cutoff", "beta", "d_cutoff", "value", "derivative", "timestamp")
+
+    def __init__(self, min_cutoff=ONE_EURO_MIN_CUTOFF, beta=ONE_EURO_BETA, d_cutoff=ONE_EURO_D_CUTOFF):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.value = None
+        self.derivative = None
+        self.timestamp = None
+
+    @staticmethod
+    def smoothing_factor(cutoff, dt):
+        """Exponential smoothing factor for a cutoff frequency and time step"""
+        tau = 1.0 / (2 * np.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, value, timestamp):
+        """Filter a (21, 2|3) landmark array observed at timestamp (seconds)"""
+        value = np.asarray(value, dtype=np.float32)
+        if self.value is None or self.value.shape != value.shape:
+            self.value = value.copy()
+            self.derivative = np.zeros_like(value)
+            self.timestamp = timestamp
+            return self.value
+
+        dt = max(timestamp - self.timestamp, 1e-6)
+        self.timestamp = timestamp
+
+        # Smoothed speed of every coordinate
+        a_d = self.smoothing_factor(self.d_cutoff, dt)
+        self.derivative += a_d * ((value - self.value) / dt - self.derivative)
+
+        # Faster landmarks get a higher cutoff, so they lag less
+        cutoff = self.min_cutoff + self.beta * np.abs(self.derivative)
+        a = self.smoothing_factor(cutoff, dt)
+        self.value += a * (value - self.value)
+        return self.value
@@ -0,0 +1,183 @@
+import datetime
+import os
+import queue
+import threading
+import time
+import numpy as np
+from startup import lazy_import
+from config import *
+
+cv2 = lazy_import("cv2")
+
+IMAGE_PARAMS = {
+    "jpg": lambda quality: [cv2.IMWRITE_JPEG_QUALITY, quality],
+    "png": lambda quality: [cv2.IMWRITE_PNG_COMPRESSION, 3],
+    "webp": lambda quality: [cv2.IMWRITE_WEBP_QUALITY, quality],
+}
+
+def timestamp_name(prefix, suffix, extension):
+    """Build a file name like prefix_20240101_120000_123_suffix.ext"""
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+    suffix = "".join(c if c.isalnum() else "_" for c in suffix)
+    return f"{prefix}_{stamp}{'_' + suffix if suffix else ''}.{extension}"
+
+class ClipRing:
+    """Preallocated ring of recent (downscaled) frames and their timestamps"""
+
+    def __init__(self, capacity, shape):
+        self.frames = np.empty((capacity,) + tuple(shape), dtype=np.uint8)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.written = 0
+
+    def append(self, frame, timestamp):
+        """Store a frame, overwriting the oldest one when full"""
+        slot = self.written % len(self.frames)
+        if frame.shape == self.frames.shape[1:]:
+            np.copyto(self.frames[slot], frame)
+        else:
+            cv2.resize(frame, (self.frames.shape[2], self.frames.shape[1]), self.frames[slot],
+                       interpolation=cv2.INTER_AREA)
+        self.timestamps[slot] = timestamp
+        self.written += 1
+
+    def window(self, start):
+        """Get a copy of the stored (frames, timestamps) from start on, oldest first"""
+        count = min(self.written, len(self.frames))
+        order = (self.written - count + np.arange(count)) % len(self.frames)
+        order = order[self.timestamps[order] >= start]
+        return self.frames[order], self.timestamps[order]
+
+class MediaWriter:
+    """Encode and write screenshots and gesture clips on a background thread
+
+    Callers only copy frames; encoding and disk writes happen on the writer
+    thread. Work that does not fit in the bounded queue is dropped and
+    counted instead of blocking the caller. Clips come from an in-memory
+    ring of recent frames: trigger_clip() keeps MEDIA_CLIP_PREROLL seconds
+    before the trigger and collects MEDIA_CLIP_POSTROLL seconds after it.
+    """
+
+    def __init__(self, output_dir=MEDIA_OUTPUT_DIR, image_format=MEDIA_IMAGE_FORMAT,
+                 quality=MEDIA_IMAGE_QUALITY, queue_size=MEDIA_QUEUE_SIZE):
+        if image_format not in IMAGE_PARAMS:
+            raise ValueError(f"Unknown image format: {image_format}")
+        self.output_dir = output_dir
+        self.image_format = image_format
+        self.quality = quality
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self.thread = threading.Thread(target=self.write_loop, name="media-writer", daemon=True)
+        self.thread.start()
+
+        # Clip capture state (caller thread only)
+        self.ring = None
+        self.clip_name = None
+        self.clip_end = 0.0
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def submit(self, job):
+        """Queue a job without blocking, returning False when it was dropped"""
+        try:
+            self.jobs.put_nowait(job)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            print(f"Media writer busy, dropped {job[0]} ({self.dropped} dropped so far)")
+            return False
+
+    def save_image(self, frame, filename=None):
+        """Queue a copy of frame to be written as an image, returning its path"""
+        filename = filename or timestamp_name("screenshot", "", self.image_format)
+        path = os.path.join(self.output_dir, filename)
+        if self.submit(("image", path, frame.copy())):
+            return path
+        return None
+
+    def add_frame(self, frame, timestamp=None):
+        """Add a frame to the clip ring, finishing the pending clip once its post-roll is in"""
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.ring is None:
+            h, w = frame.shape[:2]
+            shape = (int(h * MEDIA_CLIP_SCALE), int(w * MEDIA_CLIP_SCALE), frame.shape[2])
+            capacity = int((MEDIA_CLIP_PREROLL + MEDIA_CLIP_POSTROLL) * MEDIA_CLIP_MAX_FPS)
+            self.ring = ClipRing(capacity, shape)
+        self.ring.append(frame, timestamp)
+
+        if self.clip_name is not None and timestamp >= self.clip_end:
+            self.finish_clip()
+
+    def finish_clip(self):
+        """Copy the clip's frames out of the ring for the writer thread
+
+        Only the clip's own window is copied and the ring keeps recording, so
+        a clip triggered right after this one still gets its pre-roll.
+        """
+        frames, timestamps = self.ring.window(self.clip_end - MEDIA_CLIP_PREROLL - MEDIA_CLIP_POSTROLL)
+        self.submit(("clip", os.path.join(self.output_dir, self.clip_name), frames, timestamps))
+        self.clip_name = None
+
+    def trigger_clip(self, label="", timestamp=None):
+        """Save a clip around now; ignored while a clip is still collecting frames"""
+        if self.clip_name is not None:
+            return False
+        timestamp = time.time() if timestamp is None else timestamp
+        self.clip_name = timestamp_name("clip", label, MEDIA_CLIP_FORMAT)
+        self.clip_end = timestamp + MEDIA_CLIP_POSTROLL
+        return True
+
+    def write_loop(self):
+        """Writer thread: encode and write queued jobs until close()"""
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            try:
+                if job[0] == "image":
+                    self.write_image(job[1], job[2])
+                else:
+                    self.write_clip(job[1], job[2], job[3])
+                self.written += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Cannot write {job[1]}: {e}")
+
+    def write_image(self, path, frame):
+        """Encode and write one image"""
+        ok, data = cv2.imencode(f".{self.image_format}", frame, IMAGE_PARAMS[self.image_format](self.quality))
+        if not ok:
+            raise Exception("Encoding failed")
+        with open(path, "wb") as f:
+            f.write(data.tobytes())
+        print(f"Screenshot saved: {path}")
+
+    def write_clip(self, path, frames, timestamps):
+        """Encode frames as a video at their measured frame rate"""
+        if not len(frames):
+            return
+        duration = timestamps[-1] - timestamps[0]
+        fps = (len(frames) - 1) / duration if duration > 0 else CAMERA_FPS
+        h, w = frames.shape[1:3]
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*MEDIA_CLIP_CODEC), fps, (w, h))
+        if not writer.isOpened():
+            raise Exception(f"Cannot open video writer ({MEDIA_CLIP_CODEC})")
+        try:
+            for frame in frames:
+                writer.write(frame)
+        finally:
+            writer.release()
+        print(f"Clip saved: {path} ({len(frames)} frames)")
+
+    def close(self, timeout=MEDIA_CLOSE_TIMEOUT):
+        """Finish queued work, including a clip still collecting frames, and stop the writer thread"""
+        if self.clip_name is not None and self.ring is not None:
+            self.finish_clip()
+        deadline = time.time() + timeout
+        try:
+            self.jobs.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self.thread.join(max(deadline - time.time(), 0))
+        if self.thread.is_alive():
+            print("Media writer did not finish in time; some files may be missing")
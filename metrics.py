@@ -0,0 +1,260 @@
+import bisect
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import *
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def format_labels(labels):
+    """Format a label dict as {name="value",...}"""
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+               for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+def format_value(value):
+    """Format a sample value the way Prometheus expects"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Shards:
+    """Per-thread slots for values that are only ever added to
+
+    Each thread writes only its own slot, so updates take no lock; readers
+    sum the slots.
+    """
+    __slots__ = ("size", "slots")
+
+    def __init__(self, size=1):
+        self.size = size
+        self.slots = {}
+
+    def get(self):
+        """Get this thread's slot list"""
+        thread_id = threading.get_ident()
+        slot = self.slots.get(thread_id)
+        if slot is None:
+            slot = self.slots.setdefault(thread_id, [0] * self.size)
+        return slot
+
+    def total(self):
+        """Sum of every thread's slots"""
+        totals = [0] * self.size
+        for slot in list(self.slots.values()):
+            for i, value in enumerate(slot):
+                totals[i] += value
+        return totals
+
+class CounterCell:
+    """One labelled series of a counter"""
+    __slots__ = ("shards",)
+
+    def __init__(self):
+        self.shards = Shards()
+
+    def inc(self, amount=1):
+        """Add a non-negative amount"""
+        self.shards.get()[0] += amount
+
+    @property
+    def value(self):
+        return self.shards.total()[0]
+
+class GaugeCell:
+    """One labelled series of a gauge"""
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value):
+        """Set the current value"""
+        self.value = value
+
+class HistogramCell:
+    """One labelled series of a fixed-bucket histogram"""
+    __slots__ = ("bounds", "shards")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        # One count per bucket (the last is +Inf), then the sum of observations
+        self.shards = Shards(len(bounds) + 2)
+
+    def observe(self, value):
+        """Count one observation"""
+        slot = self.shards.get()
+        slot[bisect.bisect_left(self.bounds, value)] += 1
+        slot[-1] += value
+
+class Metric:
+    """A named metric family with optional labels"""
+    cell_type = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.cells = {}
+        self.lock = threading.Lock()
+        if not self.labelnames:
+            self.default = self.labels()
+
+    def new_cell(self):
+        return self.cell_type()
+
+    def labels(self, **labels):
+        """Get the series for a set of label values (cache it in hot loops)"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        cell = self.cells.get(key)
+        if cell is None:
+            with self.lock:
+                cell = self.cells.setdefault(key, self.new_cell())
+        return cell
+
+    def series(self):
+        """Yield (label dict, cell) for every series"""
+        for key, cell in list(self.cells.items()):
+            yield dict(zip(self.labelnames, key)), cell
+
+class Counter(Metric):
+    """Monotonic count, e.g. frames processed"""
+    kind = "counter"
+    cell_type = CounterCell
+
+    def inc(self, amount=1):
+        self.default.inc(amount)
+
+    def samples(self):
+        for labels, cell in self.series():
+            yield self.name, labels, cell.value
+
+class Gauge(Metric):
+    """Value that can go up and down, e.g. duty cycle"""
+    kind = "gauge"
+    cell_type = GaugeCell
+
+    def set(self, value):
+        self.default.set(value)
+
+    def samples(self):
+        for labels, cell in self.series():
+            yield self.name, labels, cell.value
+
+class Histogram(Metric):
+    """Distribution over fixed buckets, so histograms from many hosts can be added up"""
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=METRICS_LATENCY_BUCKETS):
+        self.bounds = sorted(buckets)
+        super().__init__(name, help_text, labelnames)
+
+    def new_cell(self):
+        return HistogramCell(self.bounds)
+
+    def observe(self, value):
+        self.default.observe(value)
+
+    def samples(self):
+        for labels, cell in self.series():
+            totals = cell.shards.total()
+            cumulative = 0
+            for bound, count in zip(self.bounds + [float("inf")], totals[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": format_value(float(bound))}, cumulative
+            yield f"{self.name}_sum", labels, totals[-1]
+            yield f"{self.name}_count", labels, cumulative
+
+class MetricsRegistry:
+    """Process-wide metrics, rendered in the Prometheus text format
+
+    const_labels (by default the host name) are added to every series, so
+    snapshots from several machines can be concatenated and compared.
+    """
+
+    def __init__(self, const_labels=None):
+        self.metrics = {}
+        self.const_labels = const_labels if const_labels is not None else {"host": socket.gethostname()}
+        self.lock = threading.Lock()
+        self.last_dump = time.time()
+
+    def register(self, metric):
+        """Add a metric, or get the one already registered under its name"""
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self.register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=METRICS_LATENCY_BUCKETS):
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self):
+        """Get all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{format_labels({**self.const_labels, **labels})} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path=METRICS_FILE):
+        """Write a snapshot to path atomically (for a node exporter textfile collector)"""
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+        self.last_dump = time.time()
+        return path
+
+    def maybe_dump(self, path=METRICS_FILE, interval=METRICS_DUMP_INTERVAL):
+        """Write a snapshot if a file is configured and the interval has passed"""
+        if path and time.time() - self.last_dump >= interval:
+            self.dump(path)
+
+    def serve(self, host=METRICS_HOST, port=METRICS_PORT):
+        """Serve GET /metrics on a background thread, returning the server"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+        print(f"Metrics on http://{host}:{server.server_address[1]}/metrics")
+        return server
+
+# Shared registry for the whole process
+metrics = MetricsRegistry()
+
+FRAMES_CAPTURED = metrics.counter("hand_gesture_frames_captured_total", "Frames read from the camera")
+FRAMES_PROCESSED = metrics.counter("hand_gesture_frames_processed_total", "Frames run through gesture analysis")
+FRAMES_DROPPED = metrics.counter("hand_gesture_frames_dropped_total", "Frames skipped because a later stage was busy",
+                                 ["stage"])
+HANDS_DETECTED = metrics.counter("hand_gesture_hands_detected_total", "Hands analyzed, summed over frames",
+                                 ["hand_type"])
+GESTURE_TRANSITIONS = metrics.counter("hand_gesture_stable_transitions_total",
+                                      "Changes of a hand's stable gesture, by new gesture", ["gesture"])
+FRAME_LATENCY = metrics.histogram("hand_gesture_latency_seconds", "Per-frame latency by stage", ["stage"])
+DETECTOR_DUTY = metrics.gauge("hand_gesture_detector_duty_ratio", "Fraction of frames the detector ran on")
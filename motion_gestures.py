@@ -0,0 +1,243 @@
+import json
+import numpy as np
+from config import *
+
+WRIST = 0
+PALM_POINTS = [WRIST, INDEX_MCP, MIDDLE_MCP, RING_MCP, PINKY_MCP]
+NUM_FEATURES = 3  # x velocity, y velocity, pinch
+
+def speed_features(velocity, speed_scale=MOTION_SPEED_SCALE):
+    """Squash (..., 2) velocities in palm sizes per second to a direction with magnitude in [0, 1)"""
+    speed = np.linalg.norm(velocity, axis=-1, keepdims=True)
+    return velocity / (speed + speed_scale)
+
+class MotionHistory:
+    """Fixed-size ring buffer of recent palm positions for one hand"""
+    __slots__ = ("positions", "palm_sizes", "pinches", "timestamps", "head", "count")
+
+    def __init__(self, capacity=MOTION_HISTORY_LENGTH):
+        self.positions = np.zeros((capacity, 2), dtype=np.float32)
+        self.palm_sizes = np.zeros(capacity, dtype=np.float32)
+        self.pinches = np.zeros(capacity, dtype=bool)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        """Forget all samples"""
+        self.head = 0
+        self.count = 0
+
+    def append(self, position, palm_size, pinch, timestamp):
+        """Add a sample, overwriting the oldest one when full"""
+        self.positions[self.head] = position
+        self.palm_sizes[self.head] = palm_size
+        self.pinches[self.head] = pinch
+        self.timestamps[self.head] = timestamp
+        self.head = (self.head + 1) % len(self.timestamps)
+        self.count = min(self.count + 1, len(self.timestamps))
+
+    def index(self, age):
+        """Buffer index of the sample age frames before the newest"""
+        return (self.head - 1 - age) % len(self.timestamps)
+
+    def velocity(self, lag=MOTION_VELOCITY_LAG):
+        """Palm velocity over the last lag frames, in palm sizes per second"""
+        lag = min(lag, self.count - 1)
+        if lag < 1:
+            return np.zeros(2, dtype=np.float32)
+        new, old = self.index(0), self.index(lag)
+        dt = max(self.timestamps[new] - self.timestamps[old], 1e-6)
+        return (self.positions[new] - self.positions[old]) / (dt * max(self.palm_sizes[new], 1e-6))
+
+    def trajectory(self):
+        """Get the buffered (frames, 2) pixel positions, oldest first"""
+        order = (self.head - self.count + np.arange(self.count)) % len(self.timestamps)
+        return self.positions[order]
+
+class MotionState:
+    """Trajectory and partial template alignments for one tracked hand"""
+    __slots__ = ("history", "cost", "steps", "candidate", "last_match")
+
+    def __init__(self, num_templates, template_length, history_length=MOTION_HISTORY_LENGTH):
+        self.history = MotionHistory(history_length)
+        self.cost = np.full((num_templates, template_length), np.inf, dtype=np.float32)
+        self.steps = np.zeros((num_templates, template_length), dtype=np.int32)
+        self.candidate = None
+        self.last_match = None
+
+    def reset(self):
+        """Drop all partial alignments and any pending match"""
+        self.cost.fill(np.inf)
+        self.steps.fill(0)
+        self.candidate = None
+
+class MotionGestureRecognizer:
+    """Match hand trajectories against motion templates with streaming subsequence DTW
+
+    Every frame adds one column to the alignment of each template against the
+    live feature stream, so a frame costs O(templates x template length)
+    however long the hand has been tracked. An alignment may start on any
+    frame, stay on a template sample (slower motion) or skip one (up to 2x
+    faster). Alignments whose mean cost exceeds MOTION_ABANDON_COST are
+    abandoned, and templates with no live alignment that could not start on
+    this frame are skipped.
+
+    A completed alignment is held as a candidate while a longer template
+    still matches the current motion, so a circle or wave is not reported as
+    the swipe it starts with.
+    """
+
+    def __init__(self, templates_file=MOTION_TEMPLATES_FILE):
+        with open(templates_file, encoding="utf-8") as f:
+            self.load(json.load(f))
+
+    def load(self, spec):
+        """Resample template paths into padded (templates, samples, features) arrays"""
+        templates = [self.build_template(t) for t in spec["templates"]]
+        self.names = [t["name"] for t in spec["templates"]]
+        self.lengths = np.array([len(t) for t, _ in templates])
+        self.template_length = int(self.lengths.max())
+
+        self.templates = np.zeros((len(templates), self.template_length, NUM_FEATURES), dtype=np.float32)
+        self.weights = np.zeros((len(templates), NUM_FEATURES), dtype=np.float32)
+        for i, (features, weights) in enumerate(templates):
+            self.templates[i, :len(features)] = features
+            self.weights[i] = weights
+
+        # Padding past each template's end never takes part in an alignment
+        self.padding = np.arange(self.template_length) >= self.lengths[:, np.newaxis]
+        self.ends = self.lengths - 1
+
+    @staticmethod
+    def build_template(template):
+        """Get (samples, features) and feature weights for one template spec"""
+        path = np.asarray(template["path"], dtype=np.float32)
+        if len(path) < 2:
+            raise ValueError(f"Motion template '{template['name']}' needs at least 2 points")
+
+        # Resample at constant speed along the path
+        samples = max(int(round(template["duration"] * MOTION_TEMPLATE_FPS)), 2)
+        distance = np.concatenate([[0], np.cumsum(np.linalg.norm(np.diff(path, axis=0), axis=1))])
+        positions = np.linspace(0, distance[-1], samples + 1)
+        points = np.stack([np.interp(positions, distance, path[:, axis]) for axis in range(2)], axis=1)
+        velocity = np.diff(points, axis=0) * (samples / template["duration"])
+
+        features = np.zeros((samples, NUM_FEATURES), dtype=np.float32)
+        features[:, :2] = speed_features(velocity)
+        weights = np.array([1.0, 1.0, 0.0], dtype=np.float32)
+        if template.get("pinch") is not None:
+            features[:, 2] = float(template["pinch"])
+            weights[2] = MOTION_PINCH_WEIGHT
+        return features, weights
+
+    def create_state(self):
+        """Create per-hand motion state sized for the loaded templates"""
+        return MotionState(len(self.names), self.template_length)
+
+    def get_gesture_names(self):
+        """Get names of all motion gestures"""
+        return list(self.names)
+
+    def observe(self, landmarks, timestamp, state):
+        """Add one hand's (21, 2|3) pixel landmarks to its trajectory
+
+        Returns the feature vector for this frame, or None while there is no
+        velocity yet.
+        """
+        points = landmarks[:, :2]
+        palm_size = np.linalg.norm(points[MIDDLE_MCP] - points[WRIST])
+        pinch = np.linalg.norm(points[THUMB_TIP] - points[INDEX_TIP]) < MOTION_PINCH_THRESHOLD * palm_size
+
+        history = state.history
+        if len(history) and timestamp - history.timestamps[history.index(0)] > MOTION_MAX_GAP:
+            history.clear()
+            state.reset()
+        history.append(points[PALM_POINTS].mean(axis=0), palm_size, pinch, timestamp)
+        if len(history) < 2:
+            return None
+
+        features = np.empty(NUM_FEATURES, dtype=np.float32)
+        features[:2] = speed_features(history.velocity())
+        features[2] = pinch
+        return features
+
+    def step(self, features, state):
+        """Extend every live alignment by one frame, returning the matched gesture or None"""
+        # Cost of starting a new alignment here decides which idle templates to evaluate
+        start_cost = self.distance(features, self.templates[:, 0], self.weights)
+        live = np.isfinite(state.cost).any(axis=1) | (start_cost <= MOTION_ABANDON_COST)
+        if not live.any():
+            state.last_match = None
+            return None
+        rows = np.flatnonzero(live)
+
+        cost = self.distance(features, self.templates[rows], self.weights[rows, np.newaxis])
+        prev_cost, prev_steps = state.cost[rows], state.steps[rows]
+
+        # Predecessors: same sample, previous sample, or two back; sample 0 may also start fresh
+        inf = np.full((len(rows), 1), np.inf, dtype=np.float32)
+        zero = np.zeros((len(rows), 1), dtype=np.int32)
+        stay = prev_cost
+        advance = np.concatenate([np.zeros_like(inf), prev_cost[:, :-1]], axis=1)
+        skip = np.concatenate([inf, inf, prev_cost[:, :-2]], axis=1)
+        choice = np.argmin(np.stack([stay, advance, skip]), axis=0)
+        best = np.choose(choice, [stay, advance, skip])
+        steps = np.choose(choice, [
+            prev_steps,
+            np.concatenate([zero, prev_steps[:, :-1]], axis=1),
+            np.concatenate([zero, zero, prev_steps[:, :-2]], axis=1),
+        ]) + 1
+
+        total = best + cost
+        mean = total / steps
+        total[(mean > MOTION_ABANDON_COST) | self.padding[rows]] = np.inf
+        state.cost[rows], state.steps[rows] = total, steps
+
+        # Alignments that match well overall and on this frame
+        on_track = (mean <= MOTION_MATCH_THRESHOLD) & (cost <= MOTION_ABANDON_COST) & np.isfinite(total)
+
+        # The motion that just matched must end before it can match again
+        if state.last_match is not None:
+            last = np.flatnonzero(rows == state.last_match)
+            if len(last) and on_track[last[0]].any():
+                return None
+            state.last_match = None
+
+        # Complete alignments; longer templates win
+        ends = self.ends[rows]
+        index = np.arange(len(rows))
+        matched = np.flatnonzero(on_track[index, ends])
+        if len(matched):
+            best = max(matched, key=lambda i: (ends[i], -mean[i, ends[i]]))
+            candidate = state.candidate
+            if candidate is None or self.lengths[rows[best]] > self.lengths[candidate]:
+                state.candidate = rows[best]
+
+        if state.candidate is None:
+            return None
+
+        # Wait while the motion could still turn into a longer template
+        longer = self.lengths[rows] > self.lengths[state.candidate]
+        if on_track[longer].any():
+            return None
+
+        match = state.candidate
+        state.reset()
+        state.last_match = match
+        return self.names[match]
+
+    @staticmethod
+    def distance(features, templates, weights):
+        """Weighted Euclidean distance from a feature vector to template samples"""
+        return np.sqrt((((templates - features) ** 2) * weights).sum(axis=-1))
+
+    def update(self, landmarks, timestamp, state):
+        """Add one hand's landmarks and match its trajectory, returning the motion gesture or None"""
+        features = self.observe(landmarks, timestamp, state)
+        if features is None:
+            return None
+        return self.step(features, state)
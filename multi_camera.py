@@ -0,0 +1,220 @@
+import argparse
+import os
+import threading
+import time
+import cv2
+from camera_handler import CameraHandler
+from hand_detector import HandDetector
+from finger_counter import FingerCounter
+from gesture_recognizer import GestureRecognizer
+from hand_tracker import HandTracker, analyze_hands
+from metrics import metrics, FRAMES_DROPPED
+from utils import draw_text_with_background
+from config import *
+
+DROPPED_BEFORE_DETECT = FRAMES_DROPPED.labels(stage="detect")
+
+class Stream:
+    """One video source with its own finger counting and gesture state"""
+
+    def __init__(self, stream_id, source):
+        self.stream_id = stream_id
+        self.source = source
+        self.camera = CameraHandler(source)
+        self.finger_counter = FingerCounter()
+        self.gesture_recognizer = GestureRecognizer()
+        self.hand_tracker = HandTracker()
+
+        # Latest captured frame waiting for detection (older frames are dropped)
+        self.pending_frame = None
+        self.busy = False
+        self.finished = False
+        self.last_scheduled = 0.0
+
+        # Latest processed (frame, hands, results), replaced as a whole so readers never mix frames
+        self.output = None
+
+        self.frames_captured = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+
+    def process(self, detector, frame):
+        """Detect hands and recognize gestures with this stream's state"""
+        results = detector.detect_hands(frame)
+        landmarks = detector.get_landmarks_array(frame)
+        hand_types = [detector.get_hand_type(i) for i in range(len(landmarks))]
+        hands = analyze_hands(landmarks, hand_types, frame.shape, self.finger_counter,
+                              self.gesture_recognizer, self.hand_tracker)
+        return hands, results
+
+class MultiCameraApp:
+    """Ingest several sources and share a pool of detector workers between them"""
+
+    def __init__(self, sources, workers=MULTI_CAMERA_WORKERS):
+        self.streams = [Stream(i, source) for i, source in enumerate(sources)]
+        self.num_workers = workers or os.cpu_count() or 1
+        self.condition = threading.Condition()
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.start_time = time.time()
+
+    def start(self):
+        """Open all sources and start capture and detector threads"""
+        for stream in self.streams:
+            stream.camera.initialize()
+            self.threads.append(threading.Thread(target=self.capture_loop, args=(stream,), daemon=True))
+        for i in range(self.num_workers):
+            self.threads.append(threading.Thread(target=self.detector_loop, name=f"detector-{i}", daemon=True))
+        self.start_time = time.time()
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def capture_loop(self, stream):
+        """Read frames from one source into its pending slot"""
+        while not self.stop_event.is_set():
+            frame = stream.camera.get_frame()
+            with self.condition:
+                if frame is None:
+                    stream.finished = True
+                    self.condition.notify_all()
+                    break
+                if stream.pending_frame is not None:
+                    stream.frames_dropped += 1
+                    DROPPED_BEFORE_DETECT.inc()
+                stream.pending_frame = frame
+                stream.frames_captured += 1
+                self.condition.notify()
+
+    def next_stream(self):
+        """Pick the idle stream with a pending frame that has waited longest"""
+        ready = [s for s in self.streams if s.pending_frame is not None and not s.busy]
+        if not ready:
+            return None
+        return min(ready, key=lambda s: s.last_scheduled)
+
+    def detector_loop(self):
+        """Detector worker: process frames from whichever stream is due next"""
+        # Frames from different streams interleave on this detector, so track nothing across frames
+        detector = HandDetector(static_image_mode=True)
+        while not self.stop_event.is_set():
+            with self.condition:
+                stream = self.next_stream()
+                while stream is None and not self.stop_event.is_set():
+                    if all(s.finished and s.pending_frame is None for s in self.streams):
+                        return
+                    self.condition.wait(timeout=PIPELINE_TIMEOUT)
+                    stream = self.next_stream()
+                if stream is None:
+                    return
+                frame = stream.pending_frame
+                stream.pending_frame = None
+                stream.busy = True
+                stream.last_scheduled = time.time()
+
+            try:
+                hands, results = stream.process(detector, frame)
+                detector.draw_landmarks(frame, results)
+                stream.output = (frame, hands, results)
+                stream.frames_processed += 1
+            finally:
+                with self.condition:
+                    stream.busy = False
+                    self.condition.notify()
+
+    def get_stats(self):
+        """Get per-stream throughput and Jain's fairness index over processed rates"""
+        elapsed = max(time.time() - self.start_time, 1e-6)
+        stats = {}
+        for stream in self.streams:
+            stats[stream.stream_id] = {
+                "source": stream.source,
+                "captured_fps": stream.frames_captured / elapsed,
+                "processed_fps": stream.frames_processed / elapsed,
+                "dropped": stream.frames_dropped,
+            }
+        rates = [s["processed_fps"] for s in stats.values()]
+        squares = sum(r * r for r in rates)
+        fairness = (sum(rates) ** 2) / (len(rates) * squares) if squares else 1.0
+        return stats, fairness
+
+    def print_stats(self):
+        """Print per-stream throughput and fairness"""
+        stats, fairness = self.get_stats()
+        for stream_id, s in stats.items():
+            print(f"Stream {stream_id} ({s['source']}): captured {s['captured_fps']:.1f} fps, "
+                  f"processed {s['processed_fps']:.1f} fps, dropped {s['dropped']}")
+        print(f"Fairness: {fairness:.3f}")
+
+    def draw_stream(self, stream):
+        """Draw stream id and per-hand gestures on a copy of its latest frame"""
+        frame, hands, _ = stream.output
+        frame = frame.copy()
+        draw_text_with_background(frame, f"Stream {stream.stream_id}", (10, 30),
+                                  text_color=(255, 255, 255), bg_color=(0, 0, 0))
+        for hand in hands:
+            draw_text_with_background(
+                frame,
+                f"{hand['hand_type']}: {hand['gesture']} ({hand['finger_count']})",
+                (10, 70 + hand["index"] * 40),
+                text_color=(0, 255, 255),
+                bg_color=(0, 0, 0)
+            )
+        return frame
+
+    def run(self, show=True):
+        """Run until all sources end or 'q' is pressed"""
+        self.start()
+        last_stats = time.time()
+        try:
+            while any(t.is_alive() for t in self.threads):
+                if show:
+                    for stream in self.streams:
+                        if stream.output is not None:
+                            cv2.imshow(f"Stream {stream.stream_id}", self.draw_stream(stream))
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        break
+                else:
+                    time.sleep(PIPELINE_TIMEOUT)
+
+                if time.time() - last_stats >= MULTI_CAMERA_STATS_INTERVAL:
+                    self.print_stats()
+                    last_stats = time.time()
+                metrics.maybe_dump()
+        finally:
+            self.stop()
+            self.print_stats()
+            if show:
+                cv2.destroyAllWindows()
+
+    def stop(self):
+        """Stop all threads and release sources"""
+        self.stop_event.set()
+        with self.condition:
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join(timeout=1.0)
+        for stream in self.streams:
+            stream.camera.release()
+
+def parse_source(source):
+    """Use numeric sources as device indices and anything else as a file path"""
+    return int(source) if source.isdigit() else source
+
+def main():
+    parser = argparse.ArgumentParser(description="Hand gesture recognition on several cameras or files")
+    parser.add_argument("sources", nargs="*", help="Device indices or video files (default: all available cameras)")
+    parser.add_argument("-w", "--workers", type=int, default=MULTI_CAMERA_WORKERS,
+                        help="Detector workers (default: one per CPU core)")
+    parser.add_argument("--headless", action="store_true", help="Do not open preview windows")
+    args = parser.parse_args()
+
+    sources = [parse_source(s) for s in args.sources] or CameraHandler().get_available_cameras()
+    if not sources:
+        print("No cameras found")
+        return
+
+    MultiCameraApp(sources, args.workers).run(show=not args.headless)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import numpy as np
+from collections import OrderedDict
+from startup import lazy_import
+from config import *
+
+cv2 = lazy_import("cv2")
+
+class Sprite:
+    """Pre-rendered BGR image with per-pixel alpha"""
+    __slots__ = ("image", "alpha", "offset")
+
+    def __init__(self, image, alpha, offset):
+        self.image = image
+        self.alpha = alpha  # (h, w, 1) uint16 coverage in 0-255
+        self.offset = offset  # Top-left corner relative to the anchor position
+
+class Overlay:
+    """HUD layer that caches rendered labels and alpha-blends them onto the frame in one pass"""
+
+    def __init__(self, max_sprites=OVERLAY_CACHE_SIZE):
+        self.max_sprites = max_sprites
+        self.cache = OrderedDict()
+        self.queue = []
+        self.hits = 0
+        self.misses = 0
+
+    def get_sprite(self, key, render):
+        """Get sprite from the LRU cache, rendering it on a miss"""
+        sprite = self.cache.get(key)
+        if sprite is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        sprite = render()
+        self.cache[key] = sprite
+        if len(self.cache) > self.max_sprites:
+            self.cache.popitem(last=False)
+        return sprite
+
+    def text(self, text, position, font=FONT, font_scale=FONT_SCALE, text_color=TEXT_COLOR,
+             bg_color=BG_COLOR, thickness=FONT_THICKNESS, padding=5):
+        """Queue text with background, positioned like draw_text_with_background"""
+        key = ("text", text, font, font_scale, text_color, bg_color, thickness, padding)
+        sprite = self.get_sprite(key, lambda: render_text(text, font, font_scale, text_color,
+                                                          bg_color, thickness, padding))
+        self.queue.append((sprite, position))
+
+    def label(self, text, position, font=FONT, font_scale=FONT_SCALE, text_color=TEXT_COLOR,
+              thickness=FONT_THICKNESS):
+        """Queue text without background, positioned like cv2.putText"""
+        key = ("label", text, font, font_scale, text_color, thickness)
+        sprite = self.get_sprite(key, lambda: render_text(text, font, font_scale, text_color,
+                                                          None, thickness, 0))
+        self.queue.append((sprite, position))
+
+    def badge(self, count, position):
+        """Queue circular finger count badge centered at position"""
+        sprite = self.get_sprite(("badge", count), lambda: render_badge(count))
+        self.queue.append((sprite, position))
+
+    def compose(self, frame):
+        """Blend all queued sprites onto frame and clear the queue"""
+        h, w = frame.shape[:2]
+        for sprite, (x, y) in self.queue:
+            x0, y0 = x + sprite.offset[0], y + sprite.offset[1]
+            sh, sw = sprite.image.shape[:2]
+
+            # Clip sprite to the frame
+            fx0, fy0 = max(x0, 0), max(y0, 0)
+            fx1, fy1 = min(x0 + sw, w), min(y0 + sh, h)
+            if fx0 >= fx1 or fy0 >= fy1:
+                continue
+            sx0, sy0 = fx0 - x0, fy0 - y0
+            image = sprite.image[sy0:sy0 + fy1 - fy0, sx0:sx0 + fx1 - fx0]
+            target = frame[fy0:fy1, fx0:fx1]
+
+            alpha = sprite.alpha[sy0:sy0 + fy1 - fy0, sx0:sx0 + fx1 - fx0]
+            target[:] = (image * alpha + target * (255 - alpha) + 127) // 255
+        self.queue = []
+        return frame
+
+def render_text(text, font, font_scale, text_color, bg_color, thickness, padding):
+    """Render text sprite; without bg_color only the glyph pixels are opaque"""
+    (text_width, text_height), baseline = cv2.getTextSize(text, font, font_scale, thickness)
+    # Extra margin so thick strokes are not clipped
+    margin = thickness
+    width = text_width + 2 * (padding + margin) + 1
+    height = text_height + baseline + 2 * (padding + margin) + 1
+    origin = (padding + margin, padding + margin + text_height)
+
+    mask = np.zeros((height, width), dtype=np.uint8)
+    if bg_color is not None:
+        image = np.zeros((height, width, 3), dtype=np.uint8)
+        cv2.rectangle(image, (margin, margin), (width - 1 - margin, height - 1 - margin), bg_color, -1)
+        cv2.putText(image, text, origin, font, font_scale, text_color, thickness)
+        cv2.rectangle(mask, (margin, margin), (width - 1 - margin, height - 1 - margin), 255, -1)
+    else:
+        # Glyph color everywhere; the text coverage becomes the alpha (keeps anti-aliased edges)
+        image = np.full((height, width, 3), text_color, dtype=np.uint8)
+        cv2.putText(mask, text, origin, font, font_scale, 255, thickness)
+
+    return make_sprite(image, mask, (-origin[0], -origin[1]))
+
+def render_badge(count):
+    """Render finger count badge, matching HandGestureApp.draw_bottom_finger_count"""
+    size = 2 * 34 + 1
+    center = (size // 2, size // 2)
+    image = np.zeros((size, size, 3), dtype=np.uint8)
+    mask = np.zeros((size, size), dtype=np.uint8)
+
+    for target, fill, ring, shadow, text in (
+        (image, (0, 255, 0), (255, 255, 255), (0, 0, 0), (255, 255, 255)),
+        (mask, 255, 255, 255, 255),
+    ):
+        cv2.circle(target, center, 30, fill, -1)
+        cv2.circle(target, center, 32, ring, 2)
+        text_origin = (center[0] - 10, center[1] + 10)
+        cv2.putText(target, str(count), text_origin, FONT, 1.2, shadow, 3)
+        cv2.putText(target, str(count), text_origin, FONT, 1.2, text, 2)
+
+    return make_sprite(image, mask, (-center[0], -center[1]))
+
+def make_sprite(image, mask, offset):
+    """Build sprite with widened arrays so blending needs no per-frame casts"""
+    return Sprite(image.astype(np.uint16), mask.astype(np.uint16)[..., np.newaxis], offset)
@@ -0,0 +1,114 @@
+import queue
+import threading
+from metrics import FRAMES_DROPPED
+from config import *
+
+DROPPED_BEFORE_DETECT = FRAMES_DROPPED.labels(stage="detect")
+DROPPED_BEFORE_DISPLAY = FRAMES_DROPPED.labels(stage="display")
+
+def put_latest(q, item):
+    """Put item in queue, dropping the oldest entries when full (latest-frame-wins)
+
+    Returns the list of dropped entries.
+    """
+    dropped = []
+    while True:
+        try:
+            q.put_nowait(item)
+            return dropped
+        except queue.Full:
+            try:
+                dropped.append(q.get_nowait())
+            except queue.Empty:
+                pass
+
+class FramePipeline:
+    """Run capture and detection on worker threads, feeding results to the render stage"""
+
+    def __init__(self, capture_fn, process_fn, queue_size=PIPELINE_QUEUE_SIZE, release_fn=None):
+        self.capture_fn = capture_fn
+        self.process_fn = process_fn
+        # Called with every frame the pipeline drops, so its buffer can be reused
+        self.release_fn = release_fn
+        self.frame_queue = queue.Queue(maxsize=queue_size)
+        self.result_queue = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.dropped_frames = 0
+        self.dropped_results = 0
+        self.error = None
+
+    def start(self):
+        """Start capture and detection workers"""
+        self.stop_event.clear()
+        self.threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._process_loop, name="detection", daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def _capture_loop(self):
+        """Capture stage: read frames and hand them to detection"""
+        try:
+            while not self.stop_event.is_set():
+                frame = self.capture_fn()
+                if frame is None:
+                    break
+                for dropped in put_latest(self.frame_queue, frame):
+                    self.dropped_frames += 1
+                    DROPPED_BEFORE_DETECT.inc()
+                    self.release(dropped)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.stop_event.set()
+
+    def _process_loop(self):
+        """Detection stage: run inference on the newest captured frame"""
+        try:
+            while not self.stop_event.is_set() or not self.frame_queue.empty():
+                try:
+                    frame = self.frame_queue.get(timeout=PIPELINE_TIMEOUT)
+                except queue.Empty:
+                    continue
+                result = self.process_fn(frame)
+                for dropped in put_latest(self.result_queue, (frame, result)):
+                    self.dropped_results += 1
+                    DROPPED_BEFORE_DISPLAY.inc()
+                    self.release(dropped[0])
+        except Exception as e:
+            self.error = e
+        finally:
+            self.stop_event.set()
+
+    def get_result(self):
+        """Get next (frame, result) pair for rendering, or None once the pipeline has stopped"""
+        while True:
+            try:
+                return self.result_queue.get(timeout=PIPELINE_TIMEOUT)
+            except queue.Empty:
+                if self.stop_event.is_set() and not any(t.is_alive() for t in self.threads):
+                    if self.error is not None:
+                        raise self.error
+                    return None
+
+    def release(self, frame):
+        """Release a frame the pipeline no longer holds"""
+        if self.release_fn is not None:
+            self.release_fn(frame)
+
+    def stop(self):
+        """Stop workers, wait for them to finish and release queued frames"""
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join(timeout=1.0)
+        self.threads = []
+
+        for q, get_frame in ((self.frame_queue, lambda item: item), (self.result_queue, lambda item: item[0])):
+            while True:
+                try:
+                    self.release(get_frame(q.get_nowait()))
+                except queue.Empty:
+                    break
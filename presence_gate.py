@@ -0,0 +1,92 @@
+import numpy as np
+from profiler import profiler
+from startup import lazy_import
+from config import *
+
+cv2 = lazy_import("cv2")
+
+class PresenceGate:
+    """Cheap motion (and optionally skin color) check deciding when to run hand detection
+
+    Frames are shrunk to a small grayscale thumbnail and compared with the
+    previous one. The detector runs on every frame while hands are seen or
+    motion was seen within the last GATE_HOLD_FRAMES frames. Otherwise it
+    sleeps, running only every GATE_IDLE_INTERVAL frames so a hand that
+    appears without moving is still found.
+    """
+
+    def __init__(self, size=GATE_SIZE, skin=GATE_SKIN):
+        self.size = size
+        self.skin = skin
+        self.small = None  # Reused thumbnail buffers
+        self.gray = None
+        self.previous = None
+        self.diff = None
+        self.ycrcb = None
+        self.skin_mask = None
+
+        self.awake = True
+        self.idle_frames = 0
+        self.motion = 0.0
+        self.frames = 0
+        self.detections = 0
+        self.recent_duty = 1.0
+
+    def measure_motion(self, frame):
+        """Get the fraction of thumbnail pixels that changed since the previous frame"""
+        self.small = cv2.resize(frame, self.size, self.small, interpolation=cv2.INTER_AREA)
+        self.gray = cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY, self.gray)
+        if self.previous is None:
+            self.previous = self.gray.copy()
+            return 1.0
+
+        self.diff = cv2.absdiff(self.gray, self.previous, self.diff)
+        self.previous, self.gray = self.gray, self.previous
+        changed = self.diff > GATE_DIFF_THRESHOLD
+
+        if self.skin:
+            # Only count changes on skin-colored pixels
+            self.ycrcb = cv2.cvtColor(self.small, cv2.COLOR_BGR2YCrCb, self.ycrcb)
+            self.skin_mask = cv2.inRange(self.ycrcb, GATE_SKIN_LOWER, GATE_SKIN_UPPER, self.skin_mask)
+            changed &= self.skin_mask.astype(bool)
+
+        return np.count_nonzero(changed) / changed.size
+
+    def should_detect(self, frame):
+        """Check whether the detector should run on this frame"""
+        with profiler.span("gate"):
+            self.motion = self.measure_motion(frame)
+        self.frames += 1
+
+        if self.motion >= GATE_MOTION_FRACTION:
+            self.idle_frames = 0
+            self.awake = True
+        elif self.awake:
+            self.idle_frames += 1
+            if self.idle_frames > GATE_HOLD_FRAMES:
+                self.awake = False
+                self.idle_frames = 0
+        else:
+            self.idle_frames += 1
+
+        detect = self.awake or self.idle_frames % GATE_IDLE_INTERVAL == 0
+        if detect:
+            self.detections += 1
+        self.recent_duty += GATE_DUTY_SMOOTHING * (float(detect) - self.recent_duty)
+        return detect
+
+    def observe(self, hand_count):
+        """Stay awake while the detector still sees hands"""
+        if hand_count:
+            self.awake = True
+            self.idle_frames = 0
+
+    @property
+    def duty_cycle(self):
+        """Fraction of all frames the detector ran on"""
+        return self.detections / self.frames if self.frames else 1.0
+
+    def describe(self):
+        """Get short description of the gate state"""
+        state = "awake" if self.awake else "asleep"
+        return f"Detector {state}: {self.recent_duty * 100:.0f}% duty ({self.duty_cycle * 100:.0f}% overall)"
@@ -0,0 +1,136 @@
+import csv
+import functools
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+import numpy as np
+from config import *
+
+class Span:
+    """Context manager that records the time spent inside it"""
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+class Profiler:
+    """Per-stage latency recorder with rolling percentiles"""
+
+    def __init__(self, enabled=PROFILE_ENABLED, window=PROFILE_WINDOW,
+                 dump_file=PROFILE_DUMP_FILE, dump_interval=PROFILE_DUMP_INTERVAL):
+        self.enabled = enabled
+        self.window = window
+        self.dump_file = dump_file
+        self.dump_interval = dump_interval
+        self.samples = {}
+        self.counts = {}
+        self.last_dump = time.time()
+
+    def span(self, name):
+        """Time a block: `with profiler.span("stage"): ...`"""
+        if not self.enabled:
+            return nullcontext()
+        return Span(self, name)
+
+    def timed(self, name=None):
+        """Decorator that times every call of a function"""
+        def decorator(func):
+            stage = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with Span(self, stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name, seconds):
+        """Record one latency sample for a stage"""
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples.setdefault(name, deque(maxlen=self.window))
+            self.counts.setdefault(name, 0)
+        samples.append(seconds)
+        self.counts[name] += 1
+
+    def reset(self):
+        """Clear all recorded samples"""
+        self.samples = {}
+        self.counts = {}
+
+    def summary(self):
+        """Get per-stage count, mean and p50/p95/p99 latency in milliseconds"""
+        stats = {}
+        for name, samples in list(self.samples.items()):
+            values = np.array(samples) * 1000.0
+            if not len(values):
+                continue
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            stats[name] = {
+                "count": self.counts[name],
+                "mean_ms": float(values.mean()),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+            }
+        return stats
+
+    def dump(self, path=None):
+        """Write summary to a JSON or CSV file (chosen by extension)"""
+        path = path or self.dump_file
+        stats = self.summary()
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["stage", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms"])
+                for name, row in stats.items():
+                    writer.writerow([name, row["count"], row["mean_ms"], row["p50_ms"], row["p95_ms"], row["p99_ms"]])
+        else:
+            with open(path, "w") as f:
+                json.dump({"timestamp": time.time(), "stages": stats}, f, indent=2)
+        return path
+
+    def maybe_dump(self):
+        """Dump summary if a dump file is configured and the interval has elapsed"""
+        if not self.enabled or not self.dump_file:
+            return False
+        now = time.time()
+        if now - self.last_dump < self.dump_interval:
+            return False
+        self.last_dump = now
+        self.dump()
+        return True
+
+    def draw(self, frame, position=(10, 150)):
+        """Draw per-stage p50/p95/p99 breakdown on frame"""
+        from utils import draw_text_with_background
+
+        x, y = position
+        for name, row in self.summary().items():
+            draw_text_with_background(
+                frame,
+                f"{name}: {row['p50_ms']:.1f}/{row['p95_ms']:.1f}/{row['p99_ms']:.1f} ms",
+                (x, y),
+                font_scale=0.5,
+                thickness=1,
+                text_color=(255, 255, 255),
+                bg_color=(0, 0, 0)
+            )
+            y += 25
+        return frame
+
+# Shared profiler used across modules
+profiler = Profiler()
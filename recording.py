@@ -0,0 +1,185 @@
+import argparse
+import os
+import struct
+import time
+from collections import Counter
+import numpy as np
+from config import *
+
+RECORDING_MAGIC = b"HGREC\x00\x00\x01"
+RECORDING_VERSION = 1
+# magic, version, max hands, landmarks per hand, record size, frame width, frame height, created
+HEADER_FORMAT = "<8sIIIIIId"
+HEADER_SIZE = 64
+HAND_TYPE_CODES = {"Left": 0, "Right": 1}
+HAND_TYPE_NAMES = {0: "Left", 1: "Right"}
+
+def record_dtype(max_hands):
+    """Fixed-width record: timestamp, hand count, handedness codes and a float32 landmark block"""
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("hand_count", "u1"),
+        ("handedness", "u1", (max_hands,)),
+        ("landmarks", "<f4", (max_hands, NUM_LANDMARKS, 3)),
+    ], align=True)
+
+class SessionRecorder:
+    """Append per-frame normalized landmarks to a recording file through a buffered writer"""
+
+    def __init__(self, path, frame_width, frame_height, max_hands=MAX_HANDS,
+                 buffer_size=RECORDING_BUFFER_SIZE):
+        self.path = path
+        self.max_hands = max_hands
+        self.dtype = record_dtype(max_hands)
+        self.record = np.zeros(1, dtype=self.dtype)
+        self.frames_written = 0
+        self.file = open(path, "wb", buffering=buffer_size)
+
+        header = struct.pack(HEADER_FORMAT, RECORDING_MAGIC, RECORDING_VERSION, max_hands, NUM_LANDMARKS,
+                             self.dtype.itemsize, frame_width, frame_height, time.time())
+        self.file.write(header.ljust(HEADER_SIZE, b"\x00"))
+
+    def write(self, landmarks, hand_types, timestamp=None):
+        """Append one frame of (hands, 21, 3) normalized landmarks"""
+        count = min(len(landmarks), self.max_hands)
+        record = self.record[0]
+        record["timestamp"] = time.time() if timestamp is None else timestamp
+        record["hand_count"] = count
+        record["handedness"] = 255
+        record["handedness"][:count] = [HAND_TYPE_CODES.get(t, 255) for t in hand_types[:count]]
+        record["landmarks"] = 0
+        record["landmarks"][:count] = landmarks[:count]
+        self.file.write(self.record.tobytes())
+        self.frames_written += 1
+
+    def close(self):
+        """Flush and close the file"""
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+class SessionReader:
+    """Memory-mapped view of a recording; frames are read from disk only when touched"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        (magic, version, self.max_hands, num_landmarks, record_size,
+         self.frame_width, self.frame_height, self.created) = struct.unpack_from(HEADER_FORMAT, header)
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            raise ValueError(f"Not a landmark recording: {path}")
+
+        self.dtype = record_dtype(self.max_hands)
+        if num_landmarks != NUM_LANDMARKS or record_size != self.dtype.itemsize:
+            raise ValueError(f"Unsupported record layout in {path}")
+
+        # A partially written trailing record is ignored by the floor division
+        num_records = (os.path.getsize(path) - HEADER_SIZE) // self.dtype.itemsize
+        if num_records > 0:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=HEADER_SIZE, shape=(num_records,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def timestamps(self):
+        """Timestamp column (memory-mapped)"""
+        return self.records["timestamp"]
+
+    def frame(self, index):
+        """Get (timestamp, (hands, 21, 3) landmarks, hand types) for one frame"""
+        record = self.records[index]
+        count = int(record["hand_count"])
+        hand_types = [HAND_TYPE_NAMES.get(int(code), "Unknown") for code in record["handedness"][:count]]
+        return float(record["timestamp"]), np.array(record["landmarks"][:count]), hand_types
+
+    def time_range(self, start, end):
+        """Get the slice of frame indices with start <= timestamp < end"""
+        first, last = np.searchsorted(self.timestamps, [start, end])
+        return slice(int(first), int(last))
+
+    def find(self, hand_count=None, hand_type=None):
+        """Get indices of frames with a given hand count and/or containing a hand type"""
+        mask = np.ones(len(self), dtype=bool)
+        if hand_count is not None:
+            mask &= self.records["hand_count"] == hand_count
+        if hand_type is not None:
+            code = HAND_TYPE_CODES[hand_type]
+            slots = np.arange(self.max_hands) < self.records["hand_count"][:, np.newaxis]
+            mask &= ((self.records["handedness"] == code) & slots).any(axis=1)
+        return np.flatnonzero(mask)
+
+    def pixel_scale(self):
+        """Scale from normalized to recorded pixel coordinates"""
+        return np.array([self.frame_width, self.frame_height, self.frame_width], dtype=np.float32)
+
+    def replay(self, finger_counter, gesture_recognizer, tracker, frames=slice(None)):
+        """Replay frames through counting, gesture recognition and tracking, yielding (timestamp, hands)"""
+        from hand_tracker import analyze_hands
+
+        scale = self.pixel_scale()
+        shape = (self.frame_height, self.frame_width)
+        for index in range(*frames.indices(len(self))):
+            timestamp, landmarks, hand_types = self.frame(index)
+            hands = analyze_hands(landmarks * scale, hand_types, shape, finger_counter,
+                                  gesture_recognizer, tracker, timestamp=timestamp)
+            yield timestamp, hands
+
+    def classify(self, gesture_recognizer, frames=slice(None), chunk_size=RECORDING_CHUNK_FRAMES):
+        """Classify every recorded hand without history, in large batches
+
+        Returns (frame indices, hand slots, gesture names) for all hands.
+        """
+        scale = self.pixel_scale()
+        frame_indices, slots, gestures = [], [], []
+        start, stop, _ = frames.indices(len(self))
+        for chunk_start in range(start, stop, chunk_size):
+            chunk = self.records[chunk_start:min(chunk_start + chunk_size, stop)]
+            valid = np.arange(self.max_hands) < chunk["hand_count"][:, np.newaxis]
+            rows, hand_slots = np.nonzero(valid)
+            if not len(rows):
+                continue
+            landmarks = chunk["landmarks"][rows, hand_slots] * scale
+            gestures.extend(gesture_recognizer.classify_gestures(None, landmarks))
+            frame_indices.append(rows + chunk_start)
+            slots.append(hand_slots)
+        if not frame_indices:
+            return np.empty(0, np.int64), np.empty(0, np.int64), []
+        return np.concatenate(frame_indices), np.concatenate(slots), gestures
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or replay a landmark recording")
+    parser.add_argument("path", help="Recording file")
+    parser.add_argument("--start", type=float, help="Only frames at or after this timestamp")
+    parser.add_argument("--end", type=float, help="Only frames before this timestamp")
+    args = parser.parse_args()
+
+    from gesture_recognizer import GestureRecognizer
+
+    reader = SessionReader(args.path)
+    start = -np.inf if args.start is None else args.start
+    end = np.inf if args.end is None else args.end
+    frames = reader.time_range(start, end)
+    selected = reader.timestamps[frames]
+    print(f"{len(reader)} frames, up to {reader.max_hands} hands, {reader.frame_width}x{reader.frame_height}")
+    if len(selected):
+        duration = selected[-1] - selected[0]
+        print(f"Selected {len(selected)} frames spanning {duration:.1f} s")
+
+    start_time = time.perf_counter()
+    _, _, gestures = reader.classify(GestureRecognizer(), frames)
+    elapsed = time.perf_counter() - start_time
+    print(f"Classified {len(gestures)} hands in {elapsed:.2f} s")
+    for gesture, count in Counter(gestures).most_common():
+        print(f"  {gesture}: {count}")
+
+if __name__ == "__main__":
+    main()
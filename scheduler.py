@@ -0,0 +1,91 @@
+from startup import lazy_import
+from config import *
+
+cv2 = lazy_import("cv2")
+
+class QualityScheduler:
+    """Lower inference resolution and detection rate when frames run over budget"""
+
+    def __init__(self, target_fps=TARGET_FPS, levels=QUALITY_LEVELS):
+        self.levels = levels
+        self.budget = 1.0 / target_fps
+        self.level = 0
+        self.average_time = 0.0
+        self.over_budget_frames = 0
+        self.under_budget_frames = 0
+        self.frame_index = 0
+        self.detect_index = 0
+        self.scaled_frame = None  # Reused downscale output
+
+        # Last two detections, used to predict landmarks on skipped frames
+        self.last_landmarks = None
+        self.previous_landmarks = None
+        self.detection_gap = 1
+
+    @property
+    def scale(self):
+        """Inference resolution scale at the current level"""
+        return self.levels[self.level][0]
+
+    @property
+    def detect_every(self):
+        """Run detection every Nth frame at the current level"""
+        return self.levels[self.level][1]
+
+    def describe(self):
+        """Get short description of the current quality level"""
+        return f"Quality: {self.level}/{len(self.levels) - 1} ({int(self.scale * 100)}%, 1/{self.detect_every})"
+
+    def update(self, frame_time):
+        """Record processing time of one frame and step the quality level if needed"""
+        self.frame_index += 1
+        self.average_time += QUALITY_SMOOTHING * (frame_time - self.average_time)
+
+        if self.average_time > self.budget:
+            self.over_budget_frames += 1
+            self.under_budget_frames = 0
+        elif self.average_time < self.budget * QUALITY_HEADROOM:
+            self.under_budget_frames += 1
+            self.over_budget_frames = 0
+        else:
+            self.over_budget_frames = 0
+            self.under_budget_frames = 0
+
+        if self.over_budget_frames >= QUALITY_ADJUST_FRAMES and self.level < len(self.levels) - 1:
+            self.set_level(self.level + 1)
+        elif self.under_budget_frames >= QUALITY_ADJUST_FRAMES and self.level > 0:
+            self.set_level(self.level - 1)
+        return self.level
+
+    def set_level(self, level):
+        """Switch quality level and restart the budget counters"""
+        self.level = level
+        self.over_budget_frames = 0
+        self.under_budget_frames = 0
+
+    def should_detect(self):
+        """Check if detection should run on the current frame"""
+        return self.last_landmarks is None or self.frame_index - self.detect_index >= self.detect_every
+
+    def scale_frame(self, frame):
+        """Downscale frame to the current inference resolution"""
+        if self.scale >= 1.0:
+            return frame
+        h, w = frame.shape[:2]
+        size = (int(w * self.scale), int(h * self.scale))
+        self.scaled_frame = cv2.resize(frame, size, self.scaled_frame, interpolation=cv2.INTER_AREA)
+        return self.scaled_frame
+
+    def observe(self, landmarks):
+        """Store (hands, 21, 3) normalized landmarks from a detection on the current frame"""
+        self.previous_landmarks = self.last_landmarks
+        self.last_landmarks = landmarks
+        self.detection_gap = max(1, self.frame_index - self.detect_index)
+        self.detect_index = self.frame_index
+
+    def predict(self):
+        """Predict landmarks for a skipped frame by extrapolating the last two detections"""
+        if self.previous_landmarks is None or self.previous_landmarks.shape != self.last_landmarks.shape:
+            return self.last_landmarks
+        velocity = (self.last_landmarks - self.previous_landmarks) / self.detection_gap
+        return self.last_landmarks + velocity * (self.frame_index - self.detect_index)
@@ -0,0 +1,120 @@
+import multiprocessing as mp
+import os
+import queue
+from multiprocessing import shared_memory
+import numpy as np
+from config import *
+
+def detector_worker(shm_name, frame_shape, num_slots, tasks, results):
+    """Detector process: detect hands in shared-memory slots named by task descriptors"""
+    from hand_detector import HandDetector
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frames = np.ndarray((num_slots,) + tuple(frame_shape), dtype=np.uint8, buffer=shm.buf)
+    # Consecutive frames go to different processes, so track nothing across frames
+    detector = HandDetector(static_image_mode=True, roi_tracking=False).warm_up(background=False)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            seq, slot = task
+            try:
+                detector.detect_hands(frames[slot])
+                landmarks = detector.get_normalized_landmarks()
+                hand_types = [detector.get_hand_type(i) for i in range(len(landmarks))]
+                results.put((seq, slot, landmarks, hand_types, None))
+            except Exception as e:
+                results.put((seq, slot, None, None, repr(e)))
+    finally:
+        del frames
+        shm.close()
+
+class SharedMemoryDetector:
+    """Run HandDetector in several processes, passing frames through shared memory slots
+
+    Only (sequence, slot) descriptors and landmark arrays travel over queues.
+    Results come back in capture order. A slot stays owned by the caller
+    from acquire_slot() until release_slot(), after its result was consumed.
+    """
+
+    def __init__(self, frame_shape, workers=SHM_WORKERS, num_slots=SHM_SLOTS):
+        self.frame_shape = tuple(frame_shape)
+        self.num_workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.num_slots = num_slots
+        frame_bytes = int(np.prod(self.frame_shape))
+        self.shm = shared_memory.SharedMemory(create=True, size=frame_bytes * num_slots)
+        self.frames = np.ndarray((num_slots,) + self.frame_shape, dtype=np.uint8, buffer=self.shm.buf)
+        self.free_slots = list(range(num_slots))
+
+        # Spawn so workers never inherit an already built MediaPipe graph
+        context = mp.get_context("spawn")
+        self.tasks = context.Queue()
+        self.results = context.Queue()
+        self.processes = [
+            context.Process(
+                target=detector_worker,
+                args=(self.shm.name, self.frame_shape, num_slots, self.tasks, self.results),
+                daemon=True
+            )
+            for _ in range(self.num_workers)
+        ]
+
+        self.next_seq = 0
+        self.next_result_seq = 0
+        self.pending = {}
+        self.in_flight = 0
+
+    def start(self):
+        """Start detector processes"""
+        for process in self.processes:
+            process.start()
+        return self
+
+    def acquire_slot(self):
+        """Get a free slot index, or None if every slot is in flight"""
+        return self.free_slots.pop() if self.free_slots else None
+
+    def frame(self, slot):
+        """Get the frame array backed by a slot"""
+        return self.frames[slot]
+
+    def submit(self, slot):
+        """Queue the frame in slot for detection, returning its sequence number"""
+        seq = self.next_seq
+        self.next_seq += 1
+        self.in_flight += 1
+        self.tasks.put((seq, slot))
+        return seq
+
+    def release_slot(self, slot):
+        """Return a slot once its frame is no longer needed"""
+        self.free_slots.append(slot)
+
+    def get_result(self, block=True, timeout=PIPELINE_TIMEOUT):
+        """Get the next result in sequence order as (seq, slot, landmarks, hand_types), or None"""
+        while self.next_result_seq not in self.pending:
+            if not self.in_flight:
+                return None
+            try:
+                seq, slot, landmarks, hand_types, error = self.results.get(block=block, timeout=timeout)
+            except queue.Empty:
+                return None
+            self.in_flight -= 1
+            if error is not None:
+                raise Exception(f"Detector process failed: {error}")
+            self.pending[seq] = (seq, slot, landmarks, hand_types)
+        self.next_result_seq += 1
+        return self.pending.pop(self.next_result_seq - 1)
+
+    def stop(self):
+        """Stop detector processes and free the shared memory"""
+        for _ in self.processes:
+            self.tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        del self.frames
+        self.shm.close()
+        self.shm.unlink()
@@ -0,0 +1,81 @@
+import importlib
+import sys
+import threading
+import time
+
+class StartupReport:
+    """Timeline of startup phases, measured from when this module was first imported"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last_mark = self.start
+        self.events = []  # (name, start, end) in seconds since self.start
+        self.lock = threading.Lock()
+
+    def elapsed(self):
+        """Seconds since startup"""
+        return time.perf_counter() - self.start
+
+    def record(self, name, started, ended=None):
+        """Record a phase that ran from perf_counter() time started to ended (default now)"""
+        ended = time.perf_counter() if ended is None else ended
+        with self.lock:
+            self.events.append((name, started - self.start, ended - self.start))
+
+    def mark(self, name):
+        """Record a main-thread phase that ran since the previous mark"""
+        now = time.perf_counter()
+        self.record(name, self.last_mark, now)
+        self.last_mark = now
+
+    def report(self):
+        """Get report lines, ordered by when each phase finished"""
+        with self.lock:
+            events = sorted(self.events, key=lambda event: event[2])
+        lines = ["Startup (ms):"]
+        for name, started, ended in events:
+            lines.append(f"  {name:<24} {(ended - started) * 1000:8.1f} done at {ended * 1000:8.1f}")
+        return lines
+
+    def print_report(self):
+        """Print the startup report"""
+        for line in self.report():
+            print(line)
+
+# Shared report for the whole process
+startup = StartupReport()
+
+class LazyModule:
+    """Stand-in for a module that imports it on first attribute access
+
+    Lets command-line tools and workers that never touch cv2 or MediaPipe
+    skip their import cost. Imports are thread-safe and recorded in the
+    startup report.
+    """
+    __slots__ = ("module_name", "module", "lock")
+
+    def __init__(self, module_name):
+        self.module_name = module_name
+        self.module = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        """Import the module now if it has not been imported yet"""
+        with self.lock:
+            if self.module is None:
+                started = time.perf_counter()
+                imported = self.module_name in sys.modules
+                self.module = importlib.import_module(self.module_name)
+                if not imported:
+                    startup.record(f"import {self.module_name}", started)
+        return self.module
+
+    def __getattr__(self, name):
+        module = self.module
+        if module is None:
+            module = self.load()
+        return getattr(module, name)
+
+def lazy_import(module_name):
+    """Get a module that is imported on first use"""
+    return LazyModule(module_name)
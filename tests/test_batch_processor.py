@@ -0,0 +1,56 @@
+import csv
+import numpy as np
+import pytest
+from config import *
+from batch_processor import write_output
+
+def empty_columns():
+    """Columns of a source in which no hands were detected"""
+    return {
+        "frame_hand_counts": np.zeros(3, dtype=np.int32),
+        "frame_size": np.array((640, 480), dtype=np.int32),
+        "frame_index": np.empty(0, np.int32),
+        "hand_type": np.empty(0, dtype=str),
+        "finger_count": np.empty(0, np.int32),
+        "fingers": np.empty((0, 5), bool),
+        "gesture": np.empty(0, dtype=str),
+        "landmarks": np.empty((0, NUM_LANDMARKS, 3), np.float32),
+    }
+
+def test_csv_without_hands(tmp_path):
+    path = tmp_path / "empty.csv"
+    write_output(empty_columns(), path, "csv")
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert len(rows) == 1
+    assert rows[0][:3] == ["frame_index", "hand_type", "finger_count"]
+    assert len(rows[0]) == 3 + 5 + 1 + NUM_LANDMARKS * 3
+
+def test_npz_without_hands(tmp_path):
+    path = tmp_path / "empty.npz"
+    write_output(empty_columns(), path, "npz")
+    data = np.load(path)
+    assert data["landmarks"].shape == (0, NUM_LANDMARKS, 3)
+    assert data["frame_hand_counts"].tolist() == [0, 0, 0]
+
+def test_csv_rows(tmp_path):
+    columns = empty_columns()
+    columns.update({
+        "frame_index": np.array([0, 2], np.int32),
+        "hand_type": np.array(["Left", "Right"]),
+        "finger_count": np.array([1, 5], np.int32),
+        "fingers": np.array([[False, True, False, False, False], [True] * 5]),
+        "gesture": np.array(["Point", "Open Hand"]),
+        "landmarks": np.arange(2 * NUM_LANDMARKS * 3, dtype=np.float32).reshape(2, NUM_LANDMARKS, 3),
+    })
+    path = tmp_path / "hands.csv"
+    write_output(columns, path, "csv")
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[1][:9] == ["0", "Left", "1", "0", "1", "0", "0", "0", "Point"]
+    assert rows[2][:9] == ["2", "Right", "5", "1", "1", "1", "1", "1", "Open Hand"]
+    assert [float(value) for value in rows[2][9:12]] == [63.0, 64.0, 65.0]
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError, match="Unknown output format"):
+        write_output(empty_columns(), tmp_path / "out.txt", "txt")
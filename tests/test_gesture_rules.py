@@ -0,0 +1,144 @@
+import json
+import numpy as np
+import pytest
+from gesture_rules import GestureRuleEngine
+
+# Fixed hand shapes in palm sizes, wrist at the origin and fingers pointing up (-y)
+MCPS = {5: (0.3, -0.95), 9: (0.0, -1.0), 13: (-0.25, -0.92), 17: (-0.45, -0.8)}
+FINGER_STEPS = {
+    "up": [(0.0, -0.45), (0.0, -0.25), (0.0, -0.2)],
+    "lean_out": [(0.15, -0.45), (0.08, -0.25), (0.06, -0.2)],
+    "lean_in": [(-0.1, -0.45), (-0.05, -0.25), (-0.04, -0.2)],
+    "curl": [(0.0, 0.15), (0.0, 0.2), (0.0, -0.05)],
+    "ring": [(0.05, -0.35), (0.15, -0.1), (0.1, 0.15)],
+}
+THUMBS = {
+    "out": [(0.25, -0.25), (0.5, -0.45), (0.7, -0.6), (0.85, -0.75)],
+    "in": [(0.25, -0.25), (0.4, -0.45), (0.3, -0.55), (0.05, -0.6)],
+    "ring": [(0.25, -0.25), (0.5, -0.55), (0.6, -0.85), (0.58, -1.2)],
+}
+
+def make_hand(thumb, fingers, rotate=0):
+    """Build a (21, 3) palm-size hand, rotated by quarter turns (counterclockwise on screen)"""
+    points = np.zeros((21, 3), dtype=np.float32)
+    points[1:5, :2] = THUMBS[thumb]
+    for (mcp, base), state in zip(MCPS.items(), fingers):
+        points[mcp, :2] = base
+        points[mcp + 1:mcp + 4, :2] = np.array(base) + np.cumsum(FINGER_STEPS[state], axis=0)
+    for _ in range(rotate % 4):
+        points[:, :2] = np.stack([points[:, 1], -points[:, 0]], axis=1)
+    return points
+
+HANDS = {
+    "Fist": make_hand("in", ["curl"] * 4),
+    "Point": make_hand("in", ["up", "curl", "curl", "curl"]),
+    "Peace": make_hand("in", ["lean_in", "up", "curl", "curl"]),
+    "Victory": make_hand("in", ["lean_out", "lean_in", "curl", "curl"]),
+    "Three": make_hand("in", ["up", "up", "up", "curl"]),
+    "Four": make_hand("in", ["up"] * 4),
+    "Open Hand": make_hand("out", ["up"] * 4),
+    "OK": make_hand("ring", ["ring", "up", "up", "up"]),
+    "Thumbs Up": make_hand("out", ["curl"] * 4, rotate=1),
+    "Thumbs Down": make_hand("out", ["curl"] * 4, rotate=3),
+}
+
+def to_pixels(hand, scale=100.0, offset=(320.0, 360.0), mirror=False):
+    """Place a palm-size hand in pixel coordinates, optionally as the other hand"""
+    pixels = hand.copy()
+    if mirror:
+        pixels[:, 0] = -pixels[:, 0]
+    pixels[:, :2] = pixels[:, :2] * scale + offset
+    return pixels
+
+@pytest.fixture(scope="module")
+def engine():
+    return GestureRuleEngine()
+
+@pytest.mark.parametrize("mirror", [False, True])
+@pytest.mark.parametrize("scale", [60.0, 250.0])
+@pytest.mark.parametrize("name", list(HANDS))
+def test_builtin_rules(engine, name, scale, mirror):
+    landmarks = to_pixels(HANDS[name], scale, mirror=mirror)[np.newaxis]
+    assert engine.classify(landmarks) == [name]
+
+def test_classify_batch_keeps_hand_order(engine):
+    names = list(HANDS)
+    landmarks = np.stack([to_pixels(HANDS[name]) for name in names])
+    assert engine.classify(landmarks) == names
+
+def test_thumb_with_other_fingers_is_not_thumbs_up(engine):
+    # "10000" rather than "*0000": a curled thumb with curled fingers is a fist
+    fingers = np.array([[True, False, False, False, False], [False, False, False, False, False]])
+    landmarks = np.stack([to_pixels(HANDS["Thumbs Up"])] * 2)
+    assert engine.classify(landmarks, fingers) == ["Thumbs Up", "Fist"]
+
+def test_thresholds_are_in_palm_sizes(engine):
+    # Victory's spread threshold is 0.25 palm sizes, so a small hand still qualifies
+    small = to_pixels(HANDS["Victory"], scale=20.0)[np.newaxis]
+    large = to_pixels(HANDS["Victory"], scale=400.0)[np.newaxis]
+    assert engine.classify(small) == engine.classify(large) == ["Victory"]
+
+def test_classify_counts(engine):
+    assert engine.classify_counts([0, 1, 2, 3, 4, 5, 6, -1]) == [
+        "Fist", "Point", "Peace", "Three", "Four", "Open Hand", "Unknown", "Unknown"]
+
+def test_empty_batch(engine):
+    assert engine.classify(np.empty((0, 21, 3), dtype=np.float32)) == []
+
+SPEC = {
+    "features": {
+        "thumb_up": {"type": "above", "a": 4, "b": 2},
+        "wide": {"type": "dx_above", "a": 4, "b": 20, "threshold": 1.0},
+    },
+    "gestures": [
+        {"name": "First", "fingers": "1****", "features": {"thumb_up": True}},
+        {"name": "Second", "fingers": "1****"},
+        {"name": "Wide", "features": {"wide": True}},
+        {"name": "Two", "count": 2},
+    ],
+}
+
+@pytest.fixture
+def load_engine(tmp_path):
+    """Build an engine from a rules spec through a rules file"""
+    def load(spec):
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps(spec), encoding="utf-8")
+        return GestureRuleEngine(path)
+    return load
+
+def code(fingers, thumb_up=False, wide=False):
+    """Expected lookup table code: finger bits first, then features in declaration order"""
+    return sum(int(c) << i for i, c in enumerate(fingers)) | thumb_up << 5 | wide << 6
+
+def test_compute_codes_bit_layout(load_engine):
+    engine = load_engine(SPEC)
+    landmarks = np.stack([to_pixels(HANDS["Thumbs Up"]), to_pixels(HANDS["Open Hand"])])
+    fingers = np.array([[True, False, False, False, False], [False, True, False, True, True]])
+    assert engine.compute_codes(landmarks, fingers).tolist() == [
+        code("10000", thumb_up=True), code("01011", thumb_up=True, wide=True)]
+
+def test_first_matching_rule_wins(load_engine):
+    engine = load_engine(SPEC)
+    names = engine.gesture_names[engine.table]
+    assert names[code("10000", thumb_up=True)] == "First"
+    assert names[code("10000", thumb_up=True, wide=True)] == "First"
+    assert names[code("10000")] == "Second"
+    assert names[code("11000", wide=True)] == "Second"
+    assert names[code("01000", wide=True)] == "Wide"
+    assert names[code("01100", wide=True)] == "Wide"
+    assert names[code("01100")] == "Two"
+    assert names[code("01110")] == "Unknown"
+    # Only pure count rules go into the count table
+    assert engine.classify_counts([1, 2]) == ["Unknown", "Two"]
+
+@pytest.mark.parametrize("spec, message", [
+    ({"gestures": [{"name": "Bad", "fingers": "1111"}]}, "must have 5 entries"),
+    ({"gestures": [{"name": "Bad", "features": {"missing": True}}]}, "Unknown feature"),
+    ({"features": {"f": {"type": "nearby", "a": 4, "b": 8}}, "gestures": []}, "Unknown feature type"),
+    ({"features": {f"f{i}": {"type": "above", "a": 4, "b": 8} for i in range(12)}, "gestures": []},
+     "Too many gesture features"),
+])
+def test_invalid_specs(load_engine, spec, message):
+    with pytest.raises(ValueError, match=message):
+        load_engine(spec)
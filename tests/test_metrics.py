@@ -0,0 +1,49 @@
+import re
+from metrics import MetricsRegistry
+
+def sample_lines(text, name):
+    """Get {labels: value} for every sample of one series name"""
+    return {labels: value for labels, value in re.findall(rf"^{name}(\{{.*\}}|) (\S+)$", text, re.MULTILINE)}
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry(const_labels={})
+    latency = registry.histogram("latency_seconds", "Latency", ["stage"], buckets=[0.1, 0.01, 1])
+    detect = latency.labels(stage="detect")
+    for value in (0.005, 0.05, 0.05, 0.5, 5.0):
+        detect.observe(value)
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert list(sample_lines(text, "latency_seconds_bucket").items()) == [
+        ('{stage="detect",le="0.01"}', "1"),
+        ('{stage="detect",le="0.1"}', "3"),
+        ('{stage="detect",le="1.0"}', "4"),
+        ('{stage="detect",le="+Inf"}', "5"),
+    ]
+    assert sample_lines(text, "latency_seconds_count") == {'{stage="detect"}': "5"}
+    assert float(sample_lines(text, "latency_seconds_sum")['{stage="detect"}']) == 5.605
+
+def test_bucket_bounds_are_inclusive():
+    registry = MetricsRegistry(const_labels={})
+    latency = registry.histogram("latency_seconds", "Latency", buckets=[1])
+    latency.observe(1)
+    assert sample_lines(registry.render(), "latency_seconds_bucket") == {'{le="1.0"}': "1", '{le="+Inf"}': "1"}
+
+def test_counter_labels_and_const_labels():
+    registry = MetricsRegistry(const_labels={"host": "a"})
+    frames = registry.counter("frames_total", "Frames", ["stage"])
+    frames.labels(stage="detect").inc()
+    frames.labels(stage="detect").inc(2)
+    frames.labels(stage='say "hi"').inc()
+
+    text = registry.render()
+    assert "# HELP frames_total Frames" in text
+    assert sample_lines(text, "frames_total") == {
+        '{host="a",stage="detect"}': "3",
+        '{host="a",stage="say \\"hi\\""}': "1",
+    }
+    assert text.endswith("\n")
+
+def test_register_returns_existing_metric():
+    registry = MetricsRegistry(const_labels={})
+    assert registry.counter("frames_total", "Frames") is registry.counter("frames_total", "Frames")
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from config import *
+from recording import HEADER_SIZE, SessionReader, SessionRecorder
+
+def landmarks(hands, value):
+    return np.full((hands, NUM_LANDMARKS, 3), value, dtype=np.float32)
+
+FRAMES = [
+    (0.0, landmarks(0, 0.0), []),
+    (0.5, landmarks(1, 0.25), ["Left"]),
+    (1.0, landmarks(2, 0.5), ["Right", "Left"]),
+    (1.5, landmarks(1, 0.75), ["Right"]),
+]
+
+@pytest.fixture
+def recording(tmp_path):
+    path = tmp_path / "session.hgrec"
+    with SessionRecorder(path, 640, 480, max_hands=2) as recorder:
+        for timestamp, hand_landmarks, hand_types in FRAMES:
+            recorder.write(hand_landmarks, hand_types, timestamp)
+    return path
+
+def test_roundtrip(recording):
+    reader = SessionReader(recording)
+    assert len(reader) == len(FRAMES)
+    assert (reader.max_hands, reader.frame_width, reader.frame_height) == (2, 640, 480)
+    for index, (timestamp, hand_landmarks, hand_types) in enumerate(FRAMES):
+        read_timestamp, read_landmarks, read_types = reader.frame(index)
+        assert read_timestamp == timestamp
+        assert read_types == hand_types
+        np.testing.assert_array_equal(read_landmarks, hand_landmarks)
+    np.testing.assert_array_equal(reader.timestamps, [frame[0] for frame in FRAMES])
+
+def test_extra_hands_are_dropped(tmp_path):
+    path = tmp_path / "session.hgrec"
+    with SessionRecorder(path, 640, 480, max_hands=1) as recorder:
+        recorder.write(landmarks(2, 0.5), ["Left", "Right"], 0.0)
+    _, read_landmarks, read_types = SessionReader(path).frame(0)
+    assert read_types == ["Left"]
+    assert read_landmarks.shape == (1, NUM_LANDMARKS, 3)
+
+def test_time_range(recording):
+    reader = SessionReader(recording)
+    assert reader.time_range(0, 1.0) == slice(0, 2)
+    assert reader.time_range(0.5, 1.5) == slice(1, 3)
+    assert reader.time_range(-np.inf, np.inf) == slice(0, 4)
+    assert reader.time_range(2.0, 3.0) == slice(4, 4)
+
+def test_find(recording):
+    reader = SessionReader(recording)
+    assert reader.find(hand_count=1).tolist() == [1, 3]
+    assert reader.find(hand_type="Left").tolist() == [1, 2]
+    assert reader.find(hand_count=1, hand_type="Right").tolist() == [3]
+
+def test_partial_trailing_record_is_ignored(recording):
+    with open(recording, "ab") as f:
+        f.write(b"\x00" * 10)
+    assert len(SessionReader(recording)) == len(FRAMES)
+
+def test_empty_recording(tmp_path):
+    path = tmp_path / "session.hgrec"
+    SessionRecorder(path, 640, 480).close()
+    reader = SessionReader(path)
+    assert len(reader) == 0
+    assert reader.time_range(0, 1) == slice(0, 0)
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "session.hgrec"
+    path.write_bytes(b"\x00" * HEADER_SIZE)
+    with pytest.raises(ValueError, match="Not a landmark recording"):
+        SessionReader(path)
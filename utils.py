@@ -1,7 +1,9 @@
-import cv2
 import numpy as np
+from startup import lazy_import
 from config import *
 
+cv2 = lazy_import("cv2")
+
 def draw_text_with_background(img, text, position, font=FONT, 
                             font_scale=FONT_SCALE, 
                             text_color=TEXT_COLOR,
@@ -25,16 +27,27 @@ def draw_text_with_background(img, text, position, font=FONT,
     return img
 
 def calculate_distance(point1, point2):
-    """Calculate Euclidean distance between two points"""
-    return np.sqrt((point1[0] - point2[0])**2 + (point1[1] - point2[1])**2)
+    """Calculate Euclidean distance between two points (or arrays of points, along the last axis)"""
+    delta = np.asarray(point1)[..., :2] - np.asarray(point2)[..., :2]
+    return np.hypot(delta[..., 0], delta[..., 1])
 
 def is_point_above(point1, point2):
     """Check if point1 is above point2"""
-    return point1[1] < point2[1]
+    return np.asarray(point1)[..., 1] < np.asarray(point2)[..., 1]
 
 def is_point_right(point1, point2):
     """Check if point1 is to the right of point2"""
-    return point1[0] > point2[0]
+    return np.asarray(point1)[..., 0] > np.asarray(point2)[..., 0]
+
+def draw_landmark_array(img, landmarks):
+    """Draw hand connections and landmarks from a (hands, 21, 2|3) pixel array"""
+    points = np.asarray(landmarks)[..., :2].astype(np.int32)
+    for hand in points:
+        for start, end in HAND_CONNECTIONS:
+            cv2.line(img, tuple(hand[start].tolist()), tuple(hand[end].tolist()), CONNECTION_COLOR, 2)
+        for point in hand.tolist():
+            cv2.circle(img, tuple(point), 3, LANDMARK_COLOR, -1)
+    return img
 
 def create_finger_count_display(count, position, size=50):
     """Create a visual display for finger count"""